@@ -0,0 +1,142 @@
+"""
+JARVIS v3 - Server-Sent Events helpers
+Frame encoding and orchestrator-to-client streaming shared by the chat endpoints
+"""
+import asyncio
+from typing import Any, AsyncIterator, Dict, List
+
+import orjson
+
+
+def sse(frame: Dict[str, Any]) -> bytes:
+    """Encode a frame as a Server-Sent Events data line"""
+    return b"data: " + orjson.dumps(frame) + b"\n\n"
+
+
+# Hot-path frames: content only varies in its text, tool_end never varies
+_SSE_CONTENT_PREFIX = b'data: {"type":"content","content":'
+_SSE_CONTENT_SUFFIX = b'}\n\n'
+SSE_TOOL_END = sse({"type": "tool_end", "content": "Tool completed"})
+
+
+def sse_content(text: str) -> bytes:
+    """Encode a content frame without building an intermediate dict"""
+    return _SSE_CONTENT_PREFIX + orjson.dumps(text) + _SSE_CONTENT_SUFFIX
+
+
+# Idle SSE streams (e.g. during long tool calls) get a comment frame this often
+# so proxies and clients don't time the connection out
+SSE_PING_INTERVAL = 15.0
+_SSE_PING = b": ping\n\n"
+
+
+async def sse_keepalive(frames: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Pass SSE frames through, emitting a ping comment whenever the stream is idle"""
+    iterator = frames.__aiter__()
+    pending = None
+
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(iterator.__anext__())
+
+            done, _ = await asyncio.wait({pending}, timeout=SSE_PING_INTERVAL)
+            if not done:
+                yield _SSE_PING
+                continue
+
+            try:
+                frame = pending.result()
+            except StopAsyncIteration:
+                break
+            finally:
+                pending = None
+
+            yield frame
+    finally:
+        # Client gone (or stream done): stop the wrapped generator now rather than at GC,
+        # so its cleanup (e.g. cancelling the orchestrator producer) runs immediately
+        if pending is not None:
+            pending.cancel()
+            await asyncio.wait({pending})
+        aclose = getattr(iterator, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+# Bounded hand-off between the orchestrator and the SSE writer: once this many
+# chunks are waiting on a slow client, the producer blocks and upstream slows
+SSE_QUEUE_SIZE = 32
+_STREAM_END = object()
+
+
+async def drain_orchestrator(queue: asyncio.Queue, stream: AsyncIterator[Dict[str, Any]]) -> None:
+    """Producer: feed orchestrator chunks into the queue, ending with a sentinel"""
+    try:
+        async for chunk in stream:
+            await queue.put(chunk)
+    except Exception as e:
+        # Hand errors to the consumer so they surface as an SSE error frame
+        await queue.put(e)
+    else:
+        await queue.put(_STREAM_END)
+
+
+# Text chunks are coalesced until this much time has passed or this many
+# characters are buffered, so each SSE frame carries more than one token
+SSE_FLUSH_INTERVAL = 0.02
+SSE_FLUSH_CHARS = 64
+
+
+async def coalesce_text(queue: asyncio.Queue) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Consume orchestrator chunks from the queue, merging consecutive text chunks.
+
+    Buffered text is flushed on the time/size thresholds above and always
+    before any non-text chunk, so ordering is preserved.
+    """
+    loop = asyncio.get_running_loop()
+    buf: List[str] = []
+    buf_len = 0
+    last_flush = loop.time()
+
+    while True:
+        # With text buffered, wait only for what's left of the flush window
+        if buf:
+            try:
+                chunk = await asyncio.wait_for(
+                    queue.get(),
+                    timeout=SSE_FLUSH_INTERVAL - (loop.time() - last_flush)
+                )
+            except asyncio.TimeoutError:
+                yield {"type": "text", "content": "".join(buf)}
+                buf.clear()
+                buf_len = 0
+                last_flush = loop.time()
+                continue
+        else:
+            chunk = await queue.get()
+
+        if chunk is _STREAM_END:
+            break
+        if isinstance(chunk, Exception):
+            raise chunk
+
+        if chunk["type"] == "text":
+            buf.append(chunk["content"])
+            buf_len += len(chunk["content"])
+            if buf_len < SSE_FLUSH_CHARS:
+                continue
+            chunk = None
+
+        if buf:
+            yield {"type": "text", "content": "".join(buf)}
+            buf.clear()
+            buf_len = 0
+            last_flush = loop.time()
+
+        if chunk is not None:
+            yield chunk
+
+    if buf:
+        yield {"type": "text", "content": "".join(buf)}
@@ -2,26 +2,39 @@
 JARVIS v3 - Compatibility API Routes
 Endpoints to maintain compatibility with existing JARVIS frontend
 """
-import json
+import asyncio
 import logging
+import time
 import httpx
-from typing import Dict, Any, List, Optional
+import orjson
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Set
 from datetime import datetime, timedelta
 from pathlib import Path
 
 from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import StreamingResponse, FileResponse
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse, FileResponse
 from pydantic import BaseModel
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Text, JSON
+from sqlalchemy import create_engine, event, func, Column, Index, Integer, String, Float, DateTime, JSON
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, scoped_session
 
 from app.config.settings import get_settings
 from app.core.orchestrator.shared import get_orchestrator
+from app.core.events import event_bus
 from app.tools.registry import tool_registry
 from app.tools.homelab.prometheus import PrometheusTool
 from app.tools.homelab.uptime_kuma import UptimeKumaTool
 from app.tools.homelab.unifi_protect import UniFiProtectQueryTool
+from app.api.sse import (
+    SSE_QUEUE_SIZE,
+    SSE_TOOL_END,
+    coalesce_text,
+    drain_orchestrator,
+    sse,
+    sse_content,
+    sse_keepalive
+)
 
 
 # Import conversation models
@@ -30,20 +43,58 @@ from app.models.conversations import (
     get_conversation,
     list_conversations,
     add_message,
-    get_conversation_messages,
     update_conversation_title
 )
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
-# Create router
-router = APIRouter()
+# Create router (JSON bodies are rendered with orjson)
+router = APIRouter(default_response_class=ORJSONResponse)
 
 # Database setup
 Base = declarative_base()
-engine = create_engine('sqlite:////opt/jarvis-v3/backend/data/jarvis.db')
-SessionLocal = sessionmaker(bind=engine)
+engine = create_engine(
+    'sqlite:////opt/jarvis-v3/backend/data/jarvis.db',
+    pool_size=10,
+    max_overflow=20,
+    pool_recycle=3600,
+    pool_pre_ping=True,
+    connect_args={"check_same_thread": False},
+    json_serializer=lambda obj: orjson.dumps(obj).decode(),
+    json_deserializer=orjson.loads
+)
+SessionLocal = scoped_session(sessionmaker(bind=engine))
+
+# SQLite allows a single writer; serialize writes in-process so tasks don't
+# hold pooled connections while waiting on SQLite's own writer lock
+_DB_WRITE_LOCK = asyncio.Lock()
+
+# Strong references to fire-and-forget DB tasks so they aren't GC'd mid-write
+_background_tasks: Set[asyncio.Task] = set()
+
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Enable WAL so reads don't block behind the writer"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
+
+@contextmanager
+def get_db():
+    """Provide a scoped session, rolling back on error and always releasing it"""
+    db = SessionLocal()
+    try:
+        yield db
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        SessionLocal.remove()
 
 
 # Database Models
@@ -52,7 +103,7 @@ class UserSettings(Base):
 
     id = Column(Integer, primary_key=True)
     user_id = Column(String, default='default')
-    settings_json = Column(Text)
+    settings_json = Column(JSON)  # Stored as JSON text; existing rows decode unchanged
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
@@ -68,6 +119,166 @@ class APICost(Base):
     tool_name = Column(String, nullable=True)
     session_id = Column(String, nullable=True)
 
+    __table_args__ = (
+        Index('ix_apicost_ts', 'timestamp'),
+        Index('ix_apicost_ts_tool', 'timestamp', 'tool_name'),
+    )
+
+
+# Database helpers (sync; run via asyncio.to_thread)
+def init_compat_db() -> None:
+    """Create missing tables and indexes (indexes are added to existing tables too)"""
+    Base.metadata.create_all(bind=engine)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+
+def _save_cost(
+    model: str,
+    input_tokens: int,
+    output_tokens: int,
+    cost: float,
+    tool_name: Optional[str],
+    session_id: Optional[str]
+) -> None:
+    """Persist a single API cost record"""
+    with get_db() as db:
+        db.add(APICost(
+            model=model,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cost_usd=cost,
+            tool_name=tool_name,
+            session_id=session_id
+        ))
+        db.commit()
+
+
+def _save_settings(user_settings: Dict[str, Any]) -> None:
+    """Create or update the default user's settings record"""
+    with get_db() as db:
+        settings_record = db.query(UserSettings).filter_by(user_id='default').first()
+
+        if settings_record:
+            settings_record.settings_json = user_settings
+            settings_record.updated_at = datetime.utcnow()
+        else:
+            settings_record = UserSettings(
+                user_id='default',
+                settings_json=user_settings
+            )
+            db.add(settings_record)
+
+        db.commit()
+
+
+def _load_settings() -> Dict[str, Any]:
+    """Load the default user's settings, falling back to defaults"""
+    with get_db() as db:
+        settings_record = db.query(UserSettings).filter_by(user_id='default').first()
+
+        if settings_record:
+            user_settings = settings_record.settings_json
+        else:
+            # Default settings
+            user_settings = {
+                "theme": "dark",
+                "model": "claude-sonnet-4-20250514",
+                "voice": "onwK4e9ZLuTAKqWW03F9",
+                "notifications": True,
+                "streaming": True
+            }
+
+    return user_settings
+
+
+def _query_costs(days: int, breakdown: str) -> Dict[str, Any]:
+    """Aggregate API cost records for the requested period and breakdown"""
+    # Calculate date range
+    start_date = datetime.utcnow() - timedelta(days=days)
+
+    with get_db() as db:
+        if breakdown == "summary":
+            # Total summary
+            total_cost, total_input_tokens, total_output_tokens, total_requests = (
+                db.query(
+                    func.coalesce(func.sum(APICost.cost_usd), 0.0),
+                    func.coalesce(func.sum(APICost.input_tokens), 0),
+                    func.coalesce(func.sum(APICost.output_tokens), 0),
+                    func.count(APICost.id)
+                )
+                .filter(APICost.timestamp >= start_date)
+                .one()
+            )
+
+            result = {
+                "period": f"{days} days",
+                "total_cost": round(total_cost, 4),
+                "total_requests": total_requests,
+                "total_input_tokens": total_input_tokens,
+                "total_output_tokens": total_output_tokens,
+                "average_cost_per_request": round(total_cost / total_requests, 4) if total_requests else 0
+            }
+
+        elif breakdown == "tool":
+            # Breakdown by tool
+            tool = func.coalesce(func.nullif(APICost.tool_name, ""), "no_tool")
+            total = func.sum(APICost.cost_usd)
+            rows = (
+                db.query(tool, total, func.count(APICost.id))
+                .filter(APICost.timestamp >= start_date)
+                .group_by(tool)
+                .order_by(total.desc())
+                .all()
+            )
+
+            result = {
+                "period": f"{days} days",
+                "by_tool": [
+                    {"tool": name, "cost": round(cost or 0, 4), "requests": requests}
+                    for name, cost, requests in rows
+                ]
+            }
+
+        else:  # breakdown == "day"
+            # Breakdown by day
+            day = func.strftime("%Y-%m-%d", APICost.timestamp)
+            rows = (
+                db.query(day, func.sum(APICost.cost_usd), func.count(APICost.id))
+                .filter(APICost.timestamp >= start_date)
+                .group_by(day)
+                .order_by(day)
+                .all()
+            )
+
+            result = {
+                "period": f"{days} days",
+                "by_day": [
+                    {"date": date, "cost": round(cost or 0, 4), "requests": requests}
+                    for date, cost, requests in rows
+                ]
+            }
+
+    return result
+
+
+# USD per (input token, output token); unknown models are billed at Sonnet rates
+_DEFAULT_PRICING = (0.000003, 0.000015)
+_MODEL_PRICING = {
+    settings.default_model: _DEFAULT_PRICING,
+    settings.haiku_model: (0.0000008, 0.000004)
+}
+
+
+async def _persist_cost(*args) -> None:
+    """Write a cost record off the event loop, serialized with other writes"""
+    try:
+        async with _DB_WRITE_LOCK:
+            await asyncio.to_thread(_save_cost, *args)
+    except Exception as e:
+        logger.error(f"Failed to save cost record: {e}")
+
 
 # Create tables
 # Get shared orchestrator instance
@@ -88,6 +299,39 @@ class SettingsUpdate(BaseModel):
 
 
 
+# Dashboard tool instances, shared across requests so the UniFi Protect auth
+# token (and any other per-tool state) survives between polls
+_prometheus = PrometheusTool()
+_uptime_kuma = UptimeKumaTool()
+_protect_query = UniFiProtectQueryTool()
+
+
+# Prometheus query cache - scrape interval is 15-30s, so results younger than
+# this are identical; collapses concurrent dashboard refreshes into one query
+PROM_CACHE_TTL = 10.0
+_PROM_CACHE: Dict[str, tuple] = {}
+_PROM_CACHE_LOCKS: Dict[str, asyncio.Lock] = {}
+
+
+async def cached_prom(query: str) -> Dict[str, Any]:
+    """Run a Prometheus query, reusing results younger than PROM_CACHE_TTL"""
+    entry = _PROM_CACHE.get(query)
+    if entry and time.monotonic() - entry[0] < PROM_CACHE_TTL:
+        return entry[1]
+
+    # Single-flight: concurrent misses for the same query wait on one fetch
+    lock = _PROM_CACHE_LOCKS.setdefault(query, asyncio.Lock())
+    async with lock:
+        entry = _PROM_CACHE.get(query)
+        if entry and time.monotonic() - entry[0] < PROM_CACHE_TTL:
+            return entry[1]
+
+        result = await _prometheus.execute(query=query)
+        if result.get("success"):
+            _PROM_CACHE[query] = (time.monotonic(), result)
+        return result
+
+
 # Helper function to generate conversation title from first message
 def generate_title(message: str) -> str:
     """Generate a short title from the first message"""
@@ -108,6 +352,7 @@ async def chat_v2(request: ChatRequestV2):
     Compatible with frontend expectations.
     """
     async def generate():
+        producer = None
         try:
             conversation_id = request.conversation_id
             conversation_history = []
@@ -117,12 +362,11 @@ async def chat_v2(request: ChatRequestV2):
                 # Load existing conversation
                 conversation = await get_conversation(conversation_id)
                 if not conversation:
-                    yield f"data: {json.dumps({'type': 'error', 'content': 'Conversation not found'})}\n\n"
+                    yield sse({"type": "error", "content": "Conversation not found"})
                     return
                 
-                # Load message history for Claude context
-                messages = await get_conversation_messages(conversation_id)
-                conversation_history = [msg.to_claude_message() for msg in messages]
+                # Message history for Claude context (loaded with the conversation)
+                conversation_history = [msg.to_claude_message() for msg in conversation.messages]
                 
                 logger.info(f"Loaded conversation {conversation_id} with {len(conversation_history)} messages")
             else:
@@ -146,38 +390,48 @@ async def chat_v2(request: ChatRequestV2):
             # Track for cost calculation and response
             input_tokens = 0
             output_tokens = 0
-            tools_used = []
+            tools_used: Set[str] = set()  # Tools often fire repeatedly; store each once
             assistant_response = ""
 
-            # Process with orchestrator, passing conversation history
-            async for chunk in get_orchestrator().process_stream(
-                message=request.message,
-                domain="homelab",
-                conversation_history=conversation_history  # Pass history to orchestrator
-            ):
+            # Process with orchestrator, passing conversation history. The
+            # orchestrator runs as a producer task so a slow client only
+            # backs up a bounded queue.
+            queue: asyncio.Queue = asyncio.Queue(maxsize=SSE_QUEUE_SIZE)
+            producer = asyncio.create_task(drain_orchestrator(
+                queue,
+                get_orchestrator().process_stream(
+                    message=request.message,
+                    domain="homelab",
+                    conversation_history=conversation_history  # Pass history to orchestrator
+                )
+            ))
+
+            async for chunk in coalesce_text(queue):
                 if chunk["type"] == "text":
                     # Accumulate assistant response
                     assistant_response += chunk["content"]
                     # Send text chunk
-                    yield f"data: {json.dumps({'type': 'content', 'content': chunk['content']})}\n\n"
+                    yield sse_content(chunk["content"])
 
                 elif chunk["type"] == "tool_use":
                     # Send tool start event
-                    tools_used.append(chunk["name"])
-                    yield f"data: {json.dumps({'type': 'tool_start', 'content': chunk['name']})}\n\n"
+                    tools_used.add(chunk["name"])
+                    yield sse({"type": "tool_start", "content": chunk["name"]})
 
                 elif chunk["type"] == "tool_result":
                     # Send tool end event
-                    yield f"data: {json.dumps({'type': 'tool_end', 'content': 'Tool completed'})}\n\n"
+                    yield SSE_TOOL_END
 
                 elif chunk["type"] == "done":
                     # Track usage for costs
                     usage = chunk.get("usage", {})
+                    model = usage.get("model", settings.default_model)
                     input_tokens = usage.get("input_tokens", 0)
                     output_tokens = usage.get("output_tokens", 0)
 
-                    # Calculate cost (Claude Sonnet 4 pricing)
-                    cost = (input_tokens * 0.000003) + (output_tokens * 0.000015)
+                    # Calculate cost at the rates of the model that answered
+                    input_price, output_price = _MODEL_PRICING.get(model, _DEFAULT_PRICING)
+                    cost = (input_tokens * input_price) + (output_tokens * output_price)
 
                     # Save assistant response to database
                     if assistant_response:
@@ -187,36 +441,36 @@ async def chat_v2(request: ChatRequestV2):
                             content=assistant_response
                         )
 
-                    # Save cost to database
-                    try:
-                        db = SessionLocal()
-                        cost_record = APICost(
-                            model=settings.default_model,
-                            input_tokens=input_tokens,
-                            output_tokens=output_tokens,
-                            cost_usd=cost,
-                            tool_name=",".join(tools_used) if tools_used else None,
-                            session_id=request.session_id
-                        )
-                        db.add(cost_record)
-                        db.commit()
-                        db.close()
-                    except Exception as e:
-                        logger.error(f"Failed to save cost record: {e}")
+                    # Save cost to database in the background so the done
+                    # frame isn't held up by disk I/O
+                    task = asyncio.create_task(_persist_cost(
+                        model,
+                        input_tokens,
+                        output_tokens,
+                        cost,
+                        ",".join(sorted(tools_used)) or None,
+                        request.session_id
+                    ))
+                    _background_tasks.add(task)
+                    task.add_done_callback(_background_tasks.discard)
 
                     # Send done event with conversation_id
-                    yield f"data: {json.dumps({'type': 'done', 'content': '', 'conversation_id': conversation_id})}\n\n"
+                    yield sse({"type": "done", "content": "", "conversation_id": conversation_id})
 
         except Exception as e:
             logger.error(f"Chat error: {e}", exc_info=True)
-            yield f"data: {json.dumps({'type': 'error', 'content': str(e)})}\n\n"
+            yield sse({"type": "error", "content": str(e)})
+        finally:
+            # Stop the orchestrator if the client disconnected mid-stream
+            if producer is not None:
+                producer.cancel()
 
     return StreamingResponse(
-        generate(),
+        sse_keepalive(generate()),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"  # Disable nginx buffering
         }
     )
 
@@ -224,6 +478,9 @@ async def chat_v2(request: ChatRequestV2):
 # ============================================================================
 # CONVERSATION HISTORY ENDPOINTS
 # ============================================================================
+_EMPTY_HISTORY_JSON = orjson.dumps({"conversations": [], "count": 0})
+
+
 @router.get("/api/history")
 async def get_history(limit: int = 50, offset: int = 0):
     """
@@ -231,6 +488,9 @@ async def get_history(limit: int = 50, offset: int = 0):
     """
     try:
         conversations = await list_conversations(limit=limit, offset=offset)
+        if not conversations:
+            return Response(_EMPTY_HISTORY_JSON, media_type="application/json")
+
         return {
             "conversations": [conv.to_dict() for conv in conversations],
             "count": len(conversations)
@@ -250,11 +510,9 @@ async def get_conversation_detail(conversation_id: str):
         if not conversation:
             raise HTTPException(status_code=404, detail="Conversation not found")
         
-        messages = await get_conversation_messages(conversation_id)
-        
         return {
             "conversation": conversation.to_dict(),
-            "messages": [msg.to_dict() for msg in messages]
+            "messages": [msg.to_dict() for msg in conversation.messages]
         }
     except HTTPException:
         raise
@@ -266,6 +524,27 @@ async def get_conversation_detail(conversation_id: str):
 # ============================================================================
 # 2. METRICS ENDPOINT - /api/metrics (GET)
 # ============================================================================
+def _pair_instance_stats(
+    total_results: List[Dict[str, Any]],
+    available_results: List[Dict[str, Any]],
+    limit: int = 3
+) -> List[tuple]:
+    """
+    Pair total/available Prometheus results by position.
+
+    Returns:
+        List of (instance, used_bytes, total_bytes, percent) for up to limit instances
+    """
+    stats = []
+    for total_result, available_result in zip(total_results[:limit], available_results[:limit]):
+        total_bytes = float(total_result["value"] or 0)
+        available_bytes = float(available_result["value"] or 0)
+        used_bytes = total_bytes - available_bytes
+        percent = (used_bytes / total_bytes * 100) if total_bytes > 0 else 0
+        stats.append((total_result["metric"].get("instance", "unknown"), used_bytes, total_bytes, percent))
+    return stats
+
+
 @router.get("/api/metrics")
 async def get_metrics():
     """
@@ -273,23 +552,13 @@ async def get_metrics():
     Returns CPU, RAM, and Disk usage.
     """
     try:
-        prometheus = PrometheusTool()
-
-        # Query CPU usage
-        cpu_result = await prometheus.execute(
-            query='100 - (avg by(instance)(rate(node_cpu_seconds_total{mode="idle"}[5m])) * 100)'
-        )
-
-        # Query RAM usage
-        ram_total = await prometheus.execute(query='node_memory_MemTotal_bytes')
-        ram_available = await prometheus.execute(query='node_memory_MemAvailable_bytes')
-
-        # Query Disk usage
-        disk_total = await prometheus.execute(
-            query='node_filesystem_size_bytes{mountpoint="/"}'
-        )
-        disk_available = await prometheus.execute(
-            query='node_filesystem_avail_bytes{mountpoint="/"}'
+        # Query CPU, RAM and Disk usage concurrently
+        cpu_result, ram_total, ram_available, disk_total, disk_available = await asyncio.gather(
+            cached_prom('100 - (avg by(instance)(rate(node_cpu_seconds_total{mode="idle"}[5m])) * 100)'),
+            cached_prom('node_memory_MemTotal_bytes'),
+            cached_prom('node_memory_MemAvailable_bytes'),
+            cached_prom('node_filesystem_size_bytes{mountpoint="/"}'),
+            cached_prom('node_filesystem_avail_bytes{mountpoint="/"}')
         )
 
         metrics = []
@@ -298,7 +567,7 @@ async def get_metrics():
         if cpu_result.get("success") and cpu_result.get("results"):
             for result in cpu_result["results"][:3]:  # Limit to 3 instances
                 instance = result["metric"].get("instance", "unknown")
-                value = float(result["value"]) if result["value"] else 0
+                value = float(result["value"] or 0)
                 metrics.append({
                     "name": f"CPU ({instance})",
                     "value": f"{value:.1f}%",
@@ -308,43 +577,27 @@ async def get_metrics():
 
         # Process RAM
         if ram_total.get("success") and ram_available.get("success"):
-            for i, total_result in enumerate(ram_total.get("results", [])[:3]):
-                if i < len(ram_available.get("results", [])):
-                    available_result = ram_available["results"][i]
-
-                    instance = total_result["metric"].get("instance", "unknown")
-                    total_bytes = float(total_result["value"]) if total_result["value"] else 0
-                    available_bytes = float(available_result["value"]) if available_result["value"] else 0
-
-                    used_bytes = total_bytes - available_bytes
-                    percent = (used_bytes / total_bytes * 100) if total_bytes > 0 else 0
-
-                    metrics.append({
-                        "name": f"RAM ({instance})",
-                        "value": f"{used_bytes / 1024**3:.1f} / {total_bytes / 1024**3:.1f} GB",
-                        "percent": percent,
-                        "unit": "GB"
-                    })
+            for instance, used_bytes, total_bytes, percent in _pair_instance_stats(
+                ram_total.get("results", []), ram_available.get("results", [])
+            ):
+                metrics.append({
+                    "name": f"RAM ({instance})",
+                    "value": f"{used_bytes / 1024**3:.1f} / {total_bytes / 1024**3:.1f} GB",
+                    "percent": percent,
+                    "unit": "GB"
+                })
 
         # Process Disk
         if disk_total.get("success") and disk_available.get("success"):
-            for i, total_result in enumerate(disk_total.get("results", [])[:3]):
-                if i < len(disk_available.get("results", [])):
-                    available_result = disk_available["results"][i]
-
-                    instance = total_result["metric"].get("instance", "unknown")
-                    total_bytes = float(total_result["value"]) if total_result["value"] else 0
-                    available_bytes = float(available_result["value"]) if available_result["value"] else 0
-
-                    used_bytes = total_bytes - available_bytes
-                    percent = (used_bytes / total_bytes * 100) if total_bytes > 0 else 0
-
-                    metrics.append({
-                        "name": f"Disk ({instance})",
-                        "value": f"{used_bytes / 1024**3:.0f} / {total_bytes / 1024**3:.0f} GB",
-                        "percent": percent,
-                        "unit": "GB"
-                    })
+            for instance, used_bytes, total_bytes, percent in _pair_instance_stats(
+                disk_total.get("results", []), disk_available.get("results", [])
+            ):
+                metrics.append({
+                    "name": f"Disk ({instance})",
+                    "value": f"{used_bytes / 1024**3:.0f} / {total_bytes / 1024**3:.0f} GB",
+                    "percent": percent,
+                    "unit": "GB"
+                })
 
         return {"metrics": metrics}
 
@@ -363,8 +616,7 @@ async def get_services():
     Returns list of services with health status.
     """
     try:
-        uptime_kuma = UptimeKumaTool()
-        result = await uptime_kuma.execute()
+        result = await _uptime_kuma.execute()
 
         if not result.get("success"):
             raise HTTPException(status_code=500, detail=result.get("error", "Unknown error"))
@@ -394,42 +646,42 @@ async def get_services():
 # ============================================================================
 # 4. SETTINGS ENDPOINTS - /api/settings (GET/POST)
 # ============================================================================
+# Static option lists, built once at import
+_AVAILABLE_MODELS = (
+    {"id": "claude-sonnet-4-20250514", "name": "Claude Sonnet 4"},
+    {"id": "claude-opus-4-20250514", "name": "Claude Opus 4"},
+    {"id": "claude-3-5-sonnet-20241022", "name": "Claude 3.5 Sonnet"},
+    {"id": "claude-3-5-haiku-20241022", "name": "Claude 3.5 Haiku"}
+)
+_AVAILABLE_VOICES = (
+    {"id": "onwK4e9ZLuTAKqWW03F9", "name": "Daniel"},
+    {"id": "EXAVITQu4vr4xnSDxMaL", "name": "Sarah"},
+    {"id": "pNInz6obpgDQGcFmaJgB", "name": "Adam"}
+)
+
+# Cached default user settings; loaded on first read, replaced on every save.
+# Loads and saves both hold _USER_SETTINGS_LOCK so a slow first load can't
+# overwrite a newer save with the settings it read before that save committed.
+_USER_SETTINGS_CACHE: Optional[Dict[str, Any]] = None
+_USER_SETTINGS_LOCK = asyncio.Lock()
+
+
 @router.get("/api/settings")
 async def get_settings():
     """
     Get user settings and available options.
     """
+    global _USER_SETTINGS_CACHE
     try:
-        db = SessionLocal()
-        settings_record = db.query(UserSettings).filter_by(user_id='default').first()
-
-        if settings_record:
-            user_settings = json.loads(settings_record.settings_json)
-        else:
-            # Default settings
-            user_settings = {
-                "theme": "dark",
-                "model": "claude-sonnet-4-20250514",
-                "voice": "onwK4e9ZLuTAKqWW03F9",
-                "notifications": True,
-                "streaming": True
-            }
-
-        db.close()
+        if _USER_SETTINGS_CACHE is None:
+            async with _USER_SETTINGS_LOCK:
+                if _USER_SETTINGS_CACHE is None:
+                    _USER_SETTINGS_CACHE = await asyncio.to_thread(_load_settings)
 
         return {
-            "settings": user_settings,
-            "available_models": [
-                {"id": "claude-sonnet-4-20250514", "name": "Claude Sonnet 4"},
-                {"id": "claude-opus-4-20250514", "name": "Claude Opus 4"},
-                {"id": "claude-3-5-sonnet-20241022", "name": "Claude 3.5 Sonnet"},
-                {"id": "claude-3-5-haiku-20241022", "name": "Claude 3.5 Haiku"}
-            ],
-            "available_voices": [
-                {"id": "onwK4e9ZLuTAKqWW03F9", "name": "Daniel"},
-                {"id": "EXAVITQu4vr4xnSDxMaL", "name": "Sarah"},
-                {"id": "pNInz6obpgDQGcFmaJgB", "name": "Adam"}
-            ]
+            "settings": dict(_USER_SETTINGS_CACHE),
+            "available_models": _AVAILABLE_MODELS,
+            "available_voices": _AVAILABLE_VOICES
         }
 
     except Exception as e:
@@ -442,22 +694,12 @@ async def update_settings(update: SettingsUpdate):
     """
     Save user settings to database.
     """
+    global _USER_SETTINGS_CACHE
     try:
-        db = SessionLocal()
-        settings_record = db.query(UserSettings).filter_by(user_id='default').first()
-
-        if settings_record:
-            settings_record.settings_json = json.dumps(update.settings)
-            settings_record.updated_at = datetime.utcnow()
-        else:
-            settings_record = UserSettings(
-                user_id='default',
-                settings_json=json.dumps(update.settings)
-            )
-            db.add(settings_record)
-
-        db.commit()
-        db.close()
+        async with _USER_SETTINGS_LOCK:
+            async with _DB_WRITE_LOCK:
+                await asyncio.to_thread(_save_settings, update.settings)
+            _USER_SETTINGS_CACHE = dict(update.settings)
 
         return {"success": True, "settings": update.settings}
 
@@ -478,67 +720,7 @@ async def get_costs(
     Get API cost tracking data.
     """
     try:
-        db = SessionLocal()
-
-        # Calculate date range
-        start_date = datetime.utcnow() - timedelta(days=days)
-
-        # Query costs
-        costs = db.query(APICost).filter(APICost.timestamp >= start_date).all()
-
-        if breakdown == "summary":
-            # Total summary
-            total_cost = sum(c.cost_usd for c in costs)
-            total_input_tokens = sum(c.input_tokens for c in costs)
-            total_output_tokens = sum(c.output_tokens for c in costs)
-
-            result = {
-                "period": f"{days} days",
-                "total_cost": round(total_cost, 4),
-                "total_requests": len(costs),
-                "total_input_tokens": total_input_tokens,
-                "total_output_tokens": total_output_tokens,
-                "average_cost_per_request": round(total_cost / len(costs), 4) if costs else 0
-            }
-
-        elif breakdown == "tool":
-            # Breakdown by tool
-            tool_costs = {}
-            for cost in costs:
-                tool = cost.tool_name or "no_tool"
-                if tool not in tool_costs:
-                    tool_costs[tool] = {"cost": 0, "requests": 0}
-                tool_costs[tool]["cost"] += cost.cost_usd
-                tool_costs[tool]["requests"] += 1
-
-            result = {
-                "period": f"{days} days",
-                "by_tool": [
-                    {"tool": k, "cost": round(v["cost"], 4), "requests": v["requests"]}
-                    for k, v in sorted(tool_costs.items(), key=lambda x: x[1]["cost"], reverse=True)
-                ]
-            }
-
-        else:  # breakdown == "day"
-            # Breakdown by day
-            daily_costs = {}
-            for cost in costs:
-                day = cost.timestamp.strftime("%Y-%m-%d")
-                if day not in daily_costs:
-                    daily_costs[day] = {"cost": 0, "requests": 0}
-                daily_costs[day]["cost"] += cost.cost_usd
-                daily_costs[day]["requests"] += 1
-
-            result = {
-                "period": f"{days} days",
-                "by_day": [
-                    {"date": k, "cost": round(v["cost"], 4), "requests": v["requests"]}
-                    for k, v in sorted(daily_costs.items())
-                ]
-            }
-
-        db.close()
-        return result
+        return await asyncio.to_thread(_query_costs, days, breakdown)
 
     except Exception as e:
         logger.error(f"Costs error: {e}", exc_info=True)
@@ -555,8 +737,7 @@ async def get_cameras():
     """
     try:
         # Use UniFi Protect query tool
-        protect_tool = UniFiProtectQueryTool()
-        result = await protect_tool.execute(query="list all cameras")
+        result = await _protect_query.execute(query="list all cameras")
 
         cameras = []
 
@@ -586,51 +767,133 @@ class TTSRequest(BaseModel):
     voice_id: Optional[str] = None
 
 
-@router.post("/api/tts")
-async def text_to_speech(request: TTSRequest):
+# Shared ElevenLabs client so TTS calls reuse pooled keep-alive connections
+# instead of paying a TCP/TLS handshake per request (HTTP/2 multiplexes
+# concurrent TTS calls over one connection, like the tool clients)
+_tts_client: Optional[httpx.AsyncClient] = None
+
+
+def get_tts_client() -> httpx.AsyncClient:
+    """Get the shared ElevenLabs HTTP client (created on first use)"""
+    global _tts_client
+    if _tts_client is None:
+        _tts_client = httpx.AsyncClient(
+            http2=True,
+            timeout=30.0,
+            limits=httpx.Limits(max_keepalive_connections=20)
+        )
+    return _tts_client
+
+
+async def close_tts_client() -> None:
+    """Close the shared ElevenLabs HTTP client"""
+    global _tts_client
+    if _tts_client is not None:
+        await _tts_client.aclose()
+        _tts_client = None
+
+
+# Request pieces shared by every TTS call (turbo v2.5 model, max latency optimization)
+_TTS_HEADERS = {
+    "xi-api-key": settings.elevenlabs_api_key or "",
+    "Content-Type": "application/json"
+}
+_TTS_BODY_TEMPLATE = {
+    "model_id": "eleven_turbo_v2_5",  # 3x faster than eleven_monolingual_v1
+    "voice_settings": {
+        "stability": 0.5,
+        "similarity_boost": 0.75
+    },
+    "optimize_streaming_latency": 4,  # Maximum latency optimization
+    "output_format": "mp3_44100_128"
+}
+_TTS_STREAM_BODY_TEMPLATE = {
+    **_TTS_BODY_TEMPLATE,
+    "voice_settings": {**_TTS_BODY_TEMPLATE["voice_settings"], "use_speaker_boost": True}
+}
+
+
+async def _tts_call(request: TTSRequest, streaming: bool) -> StreamingResponse:
     """
-    Convert text to speech using ElevenLabs with optimized settings.
-    Returns audio/mpeg stream.
+    Proxy a TTS request to ElevenLabs and return the audio as a stream.
+
+    Args:
+        request: Text and optional voice override
+        streaming: Use ElevenLabs' streaming endpoint, which starts
+            returning audio before synthesis completes
     """
     try:
         if not settings.elevenlabs_api_key:
             raise HTTPException(status_code=500, detail="ElevenLabs API key not configured")
 
         voice_id = request.voice_id or settings.elevenlabs_voice_id
+        client = get_tts_client()
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}",
-                headers={
-                    "xi-api-key": settings.elevenlabs_api_key,
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "text": request.text,
-                    "model_id": "eleven_turbo_v2_5",  # 3x faster than eleven_monolingual_v1
-                    "voice_settings": {
-                        "stability": 0.5,
-                        "similarity_boost": 0.75
-                    },
-                    "optimize_streaming_latency": 4,  # Maximum latency optimization
-                    "output_format": "mp3_44100_128"  # Optimized format
-                }
-            )
+        if streaming:
+            async def generate_audio():
+                async with client.stream(
+                    "POST",
+                    f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}/stream",
+                    headers=_TTS_HEADERS,
+                    json={**_TTS_STREAM_BODY_TEMPLATE, "text": request.text},
+                    timeout=60.0
+                ) as response:
+                    if response.status_code != 200:
+                        logger.error(f"ElevenLabs error: {response.status_code}")
+                        return
 
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"ElevenLabs API error: {response.text}"
-                )
+                    async for chunk in response.aiter_bytes(chunk_size=4096):
+                        if chunk:
+                            yield chunk
 
             return StreamingResponse(
-                iter([response.content]),
+                generate_audio(),
                 media_type="audio/mpeg",
                 headers={
-                    "Content-Disposition": "inline; filename=speech.mp3"
+                    "Content-Disposition": "inline; filename=speech.mp3",
+                    "Cache-Control": "no-cache",
+                    "X-Accel-Buffering": "no"  # Disable nginx buffering
                 }
             )
 
+        response = await client.send(
+            client.build_request(
+                "POST",
+                f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}",
+                headers=_TTS_HEADERS,
+                json={**_TTS_BODY_TEMPLATE, "text": request.text}
+            ),
+            stream=True
+        )
+
+        if response.status_code != 200:
+            try:
+                await response.aread()
+            finally:
+                await response.aclose()
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"ElevenLabs API error: {response.text}"
+            )
+
+        # Pipe audio through as it arrives rather than buffering the whole MP3. The
+        # upstream response is closed when the body ends, fails or the client goes away,
+        # so its pooled connection is always released.
+        async def relay_audio():
+            try:
+                async for chunk in response.aiter_bytes():
+                    yield chunk
+            finally:
+                await response.aclose()
+
+        return StreamingResponse(
+            relay_audio(),
+            media_type="audio/mpeg",
+            headers={
+                "Content-Disposition": "inline; filename=speech.mp3"
+            }
+        )
+
     except httpx.HTTPError as e:
         logger.error(f"TTS HTTP error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -639,61 +902,22 @@ async def text_to_speech(request: TTSRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/api/tts")
+async def text_to_speech(request: TTSRequest):
+    """
+    Convert text to speech using ElevenLabs with optimized settings.
+    Returns audio/mpeg stream.
+    """
+    return await _tts_call(request, streaming=False)
+
+
 @router.post("/api/tts/stream")
 async def text_to_speech_stream(request: TTSRequest):
     """
     Stream TTS audio using ElevenLabs streaming API.
     This provides much lower latency by starting playback immediately.
     """
-    try:
-        if not settings.elevenlabs_api_key:
-            raise HTTPException(status_code=500, detail="ElevenLabs API key not configured")
-
-        voice_id = request.voice_id or settings.elevenlabs_voice_id
-
-        async def generate_audio():
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                # Use streaming endpoint with turbo-v2.5 model for lowest latency
-                async with client.stream(
-                    "POST",
-                    f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}/stream",
-                    headers={
-                        "xi-api-key": settings.elevenlabs_api_key,
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "text": request.text,
-                        "model_id": "eleven_turbo_v2_5",  # Fastest model
-                        "voice_settings": {
-                            "stability": 0.5,
-                            "similarity_boost": 0.75,
-                            "use_speaker_boost": True
-                        },
-                        "optimize_streaming_latency": 4,  # Maximum optimization
-                        "output_format": "mp3_44100_128"  # Lower quality for speed
-                    }
-                ) as response:
-                    if response.status_code != 200:
-                        logger.error(f"ElevenLabs error: {response.status_code}")
-                        return
-                    
-                    async for chunk in response.aiter_bytes(chunk_size=4096):
-                        if chunk:
-                            yield chunk
-
-        return StreamingResponse(
-            generate_audio(),
-            media_type="audio/mpeg",
-            headers={
-                "Content-Disposition": "inline; filename=speech.mp3",
-                "Cache-Control": "no-cache",
-                "X-Accel-Buffering": "no"  # Disable nginx buffering
-            }
-        )
-
-    except Exception as e:
-        logger.error(f"TTS stream error: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=str(e))
+    return await _tts_call(request, streaming=True)
 
 
 @router.post("/api/tts/sentence")
@@ -702,48 +926,7 @@ async def text_to_speech_sentence(request: TTSRequest):
     Optimized endpoint for single sentences with minimal latency.
     Uses turbo model for fastest response.
     """
-    try:
-        if not settings.elevenlabs_api_key:
-            raise HTTPException(status_code=500, detail="ElevenLabs API key not configured")
-
-        voice_id = request.voice_id or settings.elevenlabs_voice_id
-
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}",
-                headers={
-                    "xi-api-key": settings.elevenlabs_api_key,
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "text": request.text,
-                    "model_id": "eleven_turbo_v2_5",
-                    "voice_settings": {
-                        "stability": 0.5,
-                        "similarity_boost": 0.75
-                    },
-                    "optimize_streaming_latency": 4,
-                    "output_format": "mp3_44100_128"
-                }
-            )
-
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"ElevenLabs API error: {response.text}"
-                )
-
-            return StreamingResponse(
-                iter([response.content]),
-                media_type="audio/mpeg",
-                headers={
-                    "Content-Disposition": "inline; filename=speech.mp3"
-                }
-            )
-
-    except Exception as e:
-        logger.error(f"TTS sentence error: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=str(e))
+    return await _tts_call(request, streaming=False)
 
 
 
@@ -757,20 +940,21 @@ async def get_alerts():
     Returns events from the event bus history.
     """
     try:
-        from app.core.events import event_bus
+        # History is an in-memory slice, so it's read directly on the loop
         events = event_bus.get_history(limit=20)
-        
+
         # Format as alerts
-        alerts = []
-        for event in events:
-            alerts.append({
+        alerts = [
+            {
                 "id": str(event.get("timestamp", 0)),
                 "type": event.get("type", "unknown"),
-                "message": event.get("data", {}).get("message", ""),
+                "message": (event.get("data") or {}).get("message", ""),
                 "timestamp": event.get("timestamp"),
                 "source": event.get("source", "system")
-            })
-        
+            }
+            for event in events
+        ]
+
         return {"alerts": alerts}
     except Exception as e:
         logger.error(f"Alerts error: {e}")
@@ -780,29 +964,30 @@ async def get_alerts():
 # ============================================================================
 # 9. TOPOLOGY ENDPOINT - /api/topology (GET)
 # ============================================================================
+# Static topology, serialized once at import
+_TOPOLOGY_JSON = orjson.dumps({
+    "nodes": [
+        {"id": "router", "label": "UDM SE", "type": "router", "ip": "192.168.10.1"},
+        {"id": "pve1", "label": "PVE1", "type": "server", "ip": "192.168.10.50"},
+        {"id": "pve2", "label": "PVE2", "type": "server", "ip": "192.168.10.51"},
+        {"id": "pve3", "label": "PVE3", "type": "server", "ip": "192.168.10.52"},
+        {"id": "nas", "label": "Synology", "type": "storage", "ip": "192.168.10.100"},
+        {"id": "nvr", "label": "NVR Pro", "type": "camera", "ip": "192.168.20.250"}
+    ],
+    "edges": [
+        {"from": "router", "to": "pve1"},
+        {"from": "router", "to": "pve2"},
+        {"from": "router", "to": "pve3"},
+        {"from": "router", "to": "nas"},
+        {"from": "router", "to": "nvr"}
+    ]
+})
+
+
 @router.get("/api/topology")
 async def get_topology():
     """
     Get network topology data for visualization.
     """
     # Return a basic topology structure
-    return {
-        "nodes": [
-            {"id": "router", "label": "UDM SE", "type": "router", "ip": "192.168.10.1"},
-            {"id": "pve1", "label": "PVE1", "type": "server", "ip": "192.168.10.50"},
-            {"id": "pve2", "label": "PVE2", "type": "server", "ip": "192.168.10.51"},
-            {"id": "pve3", "label": "PVE3", "type": "server", "ip": "192.168.10.52"},
-            {"id": "nas", "label": "Synology", "type": "storage", "ip": "192.168.10.100"},
-            {"id": "nvr", "label": "NVR Pro", "type": "camera", "ip": "192.168.20.250"}
-        ],
-        "edges": [
-            {"from": "router", "to": "pve1"},
-            {"from": "router", "to": "pve2"},
-            {"from": "router", "to": "pve3"},
-            {"from": "router", "to": "nas"},
-            {"from": "router", "to": "nvr"}
-        ]
-    }
-
-
-
+    return Response(_TOPOLOGY_JSON, media_type="application/json")
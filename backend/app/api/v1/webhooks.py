@@ -3,6 +3,8 @@ Webhook endpoints for JARVIS v3
 Handles incoming webhooks from external services
 """
 import logging
+import orjson
+import time
 from typing import Dict, Any
 from datetime import datetime
 
@@ -28,6 +30,132 @@ class ProtectWebhookPayload(BaseModel):
     event: Dict[str, Any]
 
 
+async def _handle_ring(
+    event_type: str, event_data: Dict[str, Any], camera_name: str, camera_id: str, now_ms: int
+):
+    """Doorbell ring event"""
+    logger.info(f"Doorbell ring detected: {camera_name}")
+
+    await publish_doorbell_event(
+        camera_name=camera_name,
+        event_data={
+            "camera_id": camera_id,
+            "camera_name": camera_name,
+            "event_type": event_type,
+            "timestamp": event_data.get("start", now_ms),
+            "raw_event": event_data
+        }
+    )
+
+    # Also publish as alert for visibility
+    await publish_alert_event(
+        alert_type="doorbell",
+        message=f"Doorbell ring at {camera_name}",
+        severity="info",
+        extra={
+            "camera_name": camera_name,
+            "camera_id": camera_id
+        }
+    )
+
+
+async def _handle_motion(
+    event_type: str, event_data: Dict[str, Any], camera_name: str, camera_id: str, now_ms: int
+):
+    """Motion detection event"""
+    logger.info(f"Motion detected: {camera_name}")
+
+    # Check for smart detection types
+    smart_detect_types = event_data.get("smartDetectTypes", [])
+
+    await publish_motion_event(
+        camera_name=camera_name,
+        event_data={
+            "camera_id": camera_id,
+            "camera_name": camera_name,
+            "event_type": event_type,
+            "smart_detect_types": smart_detect_types,
+            "timestamp": event_data.get("start", now_ms),
+            "raw_event": event_data
+        }
+    )
+
+    # If person detected, publish alert
+    if "person" in smart_detect_types:
+        await publish_alert_event(
+            alert_type="person_detected",
+            message=f"Person detected at {camera_name}",
+            severity="info",
+            extra={
+                "camera_name": camera_name,
+                "camera_id": camera_id,
+                "smart_detect_types": smart_detect_types
+            }
+        )
+
+
+async def _handle_smart(
+    event_type: str, event_data: Dict[str, Any], camera_name: str, camera_id: str, now_ms: int
+):
+    """Smart detection event (person, vehicle, animal, etc.)"""
+    smart_detect_types = event_data.get("smartDetectTypes", [])
+
+    logger.info(f"Smart detection at {camera_name}: {smart_detect_types}")
+
+    await publish_motion_event(
+        camera_name=camera_name,
+        event_data={
+            "camera_id": camera_id,
+            "camera_name": camera_name,
+            "event_type": event_type,
+            "smart_detect_types": smart_detect_types,
+            "timestamp": event_data.get("start", now_ms),
+            "raw_event": event_data
+        }
+    )
+
+    # Publish alert for smart detections
+    if smart_detect_types:
+        detection_type = smart_detect_types[0] if smart_detect_types else "object"
+        await publish_alert_event(
+            alert_type=f"{detection_type}_detected",
+            message=f"{detection_type.title()} detected at {camera_name}",
+            severity="info",
+            extra={
+                "camera_name": camera_name,
+                "camera_id": camera_id,
+                "smart_detect_types": smart_detect_types
+            }
+        )
+
+
+async def _handle_unknown(
+    event_type: str, event_data: Dict[str, Any], camera_name: str, camera_id: str, now_ms: int
+):
+    """Unknown event type - still published as a generic alert"""
+    logger.warning(f"Unknown Protect event type: {event_type}")
+
+    await publish_alert_event(
+        alert_type="protect_event",
+        message=f"Protect event at {camera_name}: {event_type}",
+        severity="info",
+        extra={
+            "camera_name": camera_name,
+            "event_type": event_type,
+            "raw_event": event_data
+        }
+    )
+
+
+# (lowercase token, handler), checked in order against the lowercased event type.
+# "smart" also covers "smartDetect*" types.
+_EVENT_HANDLERS = (
+    ("ring", _handle_ring),
+    ("motion", _handle_motion),
+    ("smart", _handle_smart),
+)
+
+
 @router.post("/webhook/protect")
 async def protect_webhook(request: Request):
     """
@@ -36,13 +164,22 @@ async def protect_webhook(request: Request):
     Receives doorbell rings, motion detection, and smart detection events.
     Publishes events to the event bus which broadcasts to WebSocket clients.
     """
+    # Decode the raw body (kept outside the try so bad JSON is a 400, not a 500)
+    body = await request.body()
     try:
-        # Get raw payload
-        payload = await request.json()
-        
-        logger.info(f"Received Protect webhook: {payload.get('type', 'unknown')}")
-        logger.debug(f"Payload: {payload}")
+        payload = orjson.loads(body)
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid JSON")
+
+    try:
+        logger.info("Received Protect webhook: %s", payload.get("type", "unknown"))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Payload: %r", payload)
         
+        # One clock read per webhook, shared by event timestamps and processed_at
+        now = time.time()
+        now_ms = int(now * 1000)
+
         event_type = payload.get("type", "")
         event_data = payload.get("event", {})
         
@@ -50,118 +187,20 @@ async def protect_webhook(request: Request):
         camera_name = event_data.get("camera", {}).get("name", "Unknown Camera")
         camera_id = event_data.get("camera", {}).get("id", "")
         
-        # Handle different event types
-        if event_type == "ring" or "ring" in event_type.lower():
-            # Doorbell ring event
-            logger.info(f"Doorbell ring detected: {camera_name}")
-            
-            await publish_doorbell_event(
-                camera_name=camera_name,
-                event_data={
-                    "camera_id": camera_id,
-                    "camera_name": camera_name,
-                    "event_type": event_type,
-                    "timestamp": event_data.get("start", datetime.now().timestamp() * 1000),
-                    "raw_event": event_data
-                }
-            )
-            
-            # Also publish as alert for visibility
-            await publish_alert_event(
-                alert_type="doorbell",
-                message=f"Doorbell ring at {camera_name}",
-                severity="info",
-                extra={
-                    "camera_name": camera_name,
-                    "camera_id": camera_id
-                }
-            )
-        
-        elif event_type == "motion" or "motion" in event_type.lower():
-            # Motion detection event
-            logger.info(f"Motion detected: {camera_name}")
-            
-            # Check for smart detection types
-            smart_detect_types = event_data.get("smartDetectTypes", [])
-            
-            await publish_motion_event(
-                camera_name=camera_name,
-                event_data={
-                    "camera_id": camera_id,
-                    "camera_name": camera_name,
-                    "event_type": event_type,
-                    "smart_detect_types": smart_detect_types,
-                    "timestamp": event_data.get("start", datetime.now().timestamp() * 1000),
-                    "raw_event": event_data
-                }
-            )
-            
-            # If person detected, publish alert
-            if "person" in smart_detect_types:
-                await publish_alert_event(
-                    alert_type="person_detected",
-                    message=f"Person detected at {camera_name}",
-                    severity="info",
-                    extra={
-                        "camera_name": camera_name,
-                        "camera_id": camera_id,
-                        "smart_detect_types": smart_detect_types
-                    }
-                )
-        
-        elif "smartDetect" in event_type or "smart" in event_type.lower():
-            # Smart detection event (person, vehicle, animal, etc.)
-            smart_detect_types = event_data.get("smartDetectTypes", [])
-            
-            logger.info(f"Smart detection at {camera_name}: {smart_detect_types}")
-            
-            await publish_motion_event(
-                camera_name=camera_name,
-                event_data={
-                    "camera_id": camera_id,
-                    "camera_name": camera_name,
-                    "event_type": event_type,
-                    "smart_detect_types": smart_detect_types,
-                    "timestamp": event_data.get("start", datetime.now().timestamp() * 1000),
-                    "raw_event": event_data
-                }
-            )
-            
-            # Publish alert for smart detections
-            if smart_detect_types:
-                detection_type = smart_detect_types[0] if smart_detect_types else "object"
-                await publish_alert_event(
-                    alert_type=f"{detection_type}_detected",
-                    message=f"{detection_type.title()} detected at {camera_name}",
-                    severity="info",
-                    extra={
-                        "camera_name": camera_name,
-                        "camera_id": camera_id,
-                        "smart_detect_types": smart_detect_types
-                    }
-                )
-        
+        # Dispatch on the first matching event type token (lowercased once)
+        event_type_lower = event_type.lower()
+        for token, handler in _EVENT_HANDLERS:
+            if token in event_type_lower:
+                await handler(event_type, event_data, camera_name, camera_id, now_ms)
+                break
         else:
-            # Unknown event type
-            logger.warning(f"Unknown Protect event type: {event_type}")
-            
-            # Still publish as generic alert
-            await publish_alert_event(
-                alert_type="protect_event",
-                message=f"Protect event at {camera_name}: {event_type}",
-                severity="info",
-                extra={
-                    "camera_name": camera_name,
-                    "event_type": event_type,
-                    "raw_event": event_data
-                }
-            )
+            await _handle_unknown(event_type, event_data, camera_name, camera_id, now_ms)
         
         return {
             "status": "ok",
             "event_type": event_type,
             "camera": camera_name,
-            "processed_at": datetime.now().isoformat()
+            "processed_at": datetime.fromtimestamp(now).isoformat()
         }
     
     except Exception as e:
@@ -3,38 +3,47 @@ WebSocket Handlers for JARVIS v3
 Manages WebSocket connections and real-time event broadcasting
 """
 import asyncio
-import json
 import logging
-from typing import Dict, Set, Optional
+import orjson
+from functools import lru_cache
+from typing import Dict, List, Optional, Set
 from datetime import datetime
 
 from fastapi import WebSocket, WebSocketDisconnect
+from app.config.settings import get_settings
 from app.core.events import event_bus, Event, EventType
 
 logger = logging.getLogger(__name__)
 
+# Outbound frames buffered per client before it is dropped as too slow, and per-frame send timeout
+SEND_QUEUE_SIZE = 256
+SEND_TIMEOUT = 5.0
+
+
+def _dumps(message: Dict) -> str:
+    """Serialize a message for a text frame (the web client JSON.parse()s event.data)"""
+    return orjson.dumps(message).decode()
+
 
 class ConnectionManager:
     """
     Manages WebSocket connections and broadcasts events to connected clients.
-    Singleton pattern to maintain a single connection pool.
+    Use get_connection_manager() (or the module-level connection_manager) for the
+    shared connection pool.
     """
-    _instance: Optional['ConnectionManager'] = None
-    
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance._initialized = False
-        return cls._instance
     
     def __init__(self):
-        # Only initialize once
-        if self._initialized:
-            return
-        
-        self.active_connections: Set[WebSocket] = set()
+        # Insertion-ordered set: O(1) add/remove, and broadcasts walk clients in connect order
+        self.active_connections: Dict[WebSocket, None] = {}
         self.client_info: Dict[WebSocket, Dict] = {}
-        self._initialized = True
+        
+        # Event batching: events arriving within the window go out as one frame (0 = off)
+        self._batch_window = get_settings().ws_batch_window_ms / 1000
+        self._pending_events: List[str] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        
+        # Strong references to close tasks for dropped clients so they aren't GC'd mid-close
+        self._close_tasks: Set[asyncio.Task] = set()
         
         # Subscribe to all events from event bus
         event_bus.subscribe_all(self._on_event)
@@ -50,13 +59,18 @@ class ConnectionManager:
             client_id: Optional client identifier
         """
         await websocket.accept()
-        self.active_connections.add(websocket)
+        self.active_connections[websocket] = None
+        
+        connected_at = datetime.now().isoformat()
         
-        # Store client info
+        # Store client info; outbound frames go through a per-client queue drained by its own task
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SEND_QUEUE_SIZE)
         self.client_info[websocket] = {
             "client_id": client_id or f"client_{id(websocket)}",
-            "connected_at": datetime.now().isoformat(),
-            "events_sent": 0
+            "connected_at": connected_at,
+            "events_sent": 0,
+            "queue": queue,
+            "sender": asyncio.create_task(self._sender_loop(websocket, queue))
         }
         
         logger.info(f"WebSocket client connected: {self.client_info[websocket]['client_id']} (Total: {len(self.active_connections)})")
@@ -67,7 +81,7 @@ class ConnectionManager:
                 "type": "system",
                 "event": "connected",
                 "message": "Connected to JARVIS v3",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": connected_at
             },
             websocket
         )
@@ -80,32 +94,81 @@ class ConnectionManager:
             websocket: WebSocket connection to remove
         """
         if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
+            del self.active_connections[websocket]
             
             client_id = self.client_info.get(websocket, {}).get("client_id", "unknown")
             logger.info(f"WebSocket client disconnected: {client_id} (Remaining: {len(self.active_connections)})")
             
-            # Clean up client info
-            if websocket in self.client_info:
-                del self.client_info[websocket]
+            # Clean up client info and stop its sender
+            info = self.client_info.pop(websocket, None)
+            if info and info["sender"] is not asyncio.current_task():
+                info["sender"].cancel()
     
-    async def send_personal_message(self, message: Dict, websocket: WebSocket) -> None:
+    async def _sender_loop(self, websocket: WebSocket, queue: asyncio.Queue) -> None:
         """
-        Send a message to a specific client.
+        Drain a client's outbound queue, one frame at a time.
+        
+        Args:
+            websocket: WebSocket connection to send to
+            queue: The client's queue of serialized frames
+        """
+        try:
+            while True:
+                payload = await queue.get()
+                await asyncio.wait_for(websocket.send_text(payload), timeout=SEND_TIMEOUT)
+                
+                # Update stats
+                if websocket in self.client_info:
+                    self.client_info[websocket]["events_sent"] += 1
+        except Exception as e:
+            logger.error(f"Error sending message to client: {e!r}")
+            self.disconnect(websocket)
+    
+    def _enqueue(self, websocket: WebSocket, payload: str) -> None:
+        """
+        Queue a serialized frame for a client, dropping the client if its queue is full.
         
         Args:
-            message: Message to send (will be JSON serialized)
             websocket: Target WebSocket connection
+            payload: Serialized message
         """
+        info = self.client_info.get(websocket)
+        if info is None:
+            return
+        
         try:
-            await websocket.send_json(message)
+            info["queue"].put_nowait(payload)
+        except asyncio.QueueFull:
+            logger.warning(f"Dropping slow WebSocket client: {info['client_id']}")
+            self.disconnect(websocket)
             
-            # Update stats
-            if websocket in self.client_info:
-                self.client_info[websocket]["events_sent"] += 1
+            # Tell the peer why (1013 = try again later) instead of leaving the socket open
+            task = asyncio.create_task(self._close(websocket, code=1013))
+            self._close_tasks.add(task)
+            task.add_done_callback(self._close_tasks.discard)
+    
+    async def _close(self, websocket: WebSocket, code: int) -> None:
+        """
+        Close a dropped client's socket, ignoring errors if it is already gone.
+        
+        Args:
+            websocket: WebSocket connection to close
+            code: WebSocket close code
+        """
+        try:
+            await websocket.close(code=code)
         except Exception as e:
-            logger.error(f"Error sending message to client: {e}")
-            self.disconnect(websocket)
+            logger.debug(f"Error closing dropped WebSocket client: {e!r}")
+    
+    async def send_personal_message(self, message: Dict, websocket: WebSocket) -> None:
+        """
+        Send a message to a specific client.
+        
+        Args:
+            message: Message to send (will be JSON serialized)
+            websocket: Target WebSocket connection
+        """
+        self._enqueue(websocket, _dumps(message))
     
     async def broadcast(self, message: Dict, exclude: Optional[WebSocket] = None) -> None:
         """
@@ -115,25 +178,32 @@ class ConnectionManager:
             message: Message to broadcast (will be JSON serialized)
             exclude: Optional WebSocket connection to exclude from broadcast
         """
-        disconnected = []
+        self.broadcast_nowait(message, exclude)
+    
+    def broadcast_nowait(self, message: Dict, exclude: Optional[WebSocket] = None) -> None:
+        """
+        Broadcast a message without awaiting - usable from sync code and callbacks.
         
-        for connection in self.active_connections:
-            if exclude and connection == exclude:
-                continue
-            
-            try:
-                await connection.send_json(message)
-                
-                # Update stats
-                if connection in self.client_info:
-                    self.client_info[connection]["events_sent"] += 1
-            except Exception as e:
-                logger.error(f"Error broadcasting to client: {e}")
-                disconnected.append(connection)
+        Frames are queued for each client's sender task, so this never suspends
+        the caller; clients whose queues are full are dropped.
         
-        # Clean up disconnected clients
-        for connection in disconnected:
-            self.disconnect(connection)
+        Args:
+            message: Message to broadcast (will be JSON serialized)
+            exclude: Optional WebSocket connection to exclude from broadcast
+        """
+        self._broadcast_payload(_dumps(message), exclude)
+    
+    def _broadcast_payload(self, payload: str, exclude: Optional[WebSocket] = None) -> None:
+        """
+        Queue an already-serialized message for all connected clients.
+        
+        Args:
+            payload: Serialized message, shared by every client
+            exclude: Optional WebSocket connection to exclude from broadcast
+        """
+        for connection in list(self.active_connections):
+            if connection is not exclude:
+                self._enqueue(connection, payload)
     
     async def _on_event(self, event: Event) -> None:
         """
@@ -142,13 +212,29 @@ class ConnectionManager:
         Args:
             event: Event from the event bus
         """
-        # Convert event to WebSocket message format
-        message = event.to_dict()
+        logger.debug("Broadcasting %s event to %d clients", event.type.value, len(self.active_connections))
+        
+        if self._batch_window <= 0:
+            # Broadcast the event's cached serialization to all connected clients
+            self._broadcast_payload(event.to_json())
+            return
         
-        logger.debug(f"Broadcasting {event.type.value} event to {len(self.active_connections)} clients")
+        # Hold the event until the batch window closes
+        self._pending_events.append(event.to_json())
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                self._batch_window, self._flush_events
+            )
+    
+    def _flush_events(self) -> None:
+        """Broadcast batched events: a lone event as-is, several as one JSON array frame"""
+        pending, self._pending_events = self._pending_events, []
+        self._flush_handle = None
         
-        # Broadcast to all connected clients
-        await self.broadcast(message)
+        if len(pending) == 1:
+            self._broadcast_payload(pending[0])
+        elif pending:
+            self._broadcast_payload("[" + ",".join(pending) + "]")
     
     async def send_ping(self, websocket: WebSocket) -> None:
         """
@@ -157,14 +243,10 @@ class ConnectionManager:
         Args:
             websocket: WebSocket connection to ping
         """
-        try:
-            await websocket.send_json({
-                "type": "ping",
-                "timestamp": datetime.now().isoformat()
-            })
-        except Exception as e:
-            logger.error(f"Error sending ping: {e}")
-            self.disconnect(websocket)
+        self._enqueue(websocket, _dumps({
+            "type": "ping",
+            "timestamp": datetime.now().isoformat()
+        }))
     
     def get_stats(self) -> Dict:
         """Get statistics about active connections"""
@@ -181,8 +263,14 @@ class ConnectionManager:
         }
 
 
+@lru_cache
+def get_connection_manager() -> ConnectionManager:
+    """Get the shared connection manager"""
+    return ConnectionManager()
+
+
 # Global instance
-connection_manager = ConnectionManager()
+connection_manager = get_connection_manager()
 
 
 async def websocket_endpoint(websocket: WebSocket, client_id: Optional[str] = None):
@@ -196,19 +284,24 @@ async def websocket_endpoint(websocket: WebSocket, client_id: Optional[str] = No
     await connection_manager.connect(websocket, client_id)
     
     try:
-        # Keep connection alive with ping/pong
-        while True:
+        # Keep connection alive with ping/pong (until dropped by the manager)
+        while websocket in connection_manager.client_info:
             try:
                 # Wait for message with timeout
-                data = await asyncio.wait_for(
-                    websocket.receive_text(),
+                frame = await asyncio.wait_for(
+                    websocket.receive(),
                     timeout=30.0  # 30 second timeout
                 )
+                if frame["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(frame.get("code", 1000))
+                
+                # orjson parses binary frames straight from bytes; the web client sends text frames
+                data = frame.get("bytes") or frame.get("text") or ""
                 
                 # Parse message
                 try:
-                    message = json.loads(data)
-                except json.JSONDecodeError:
+                    message = orjson.loads(data)
+                except orjson.JSONDecodeError:
                     await connection_manager.send_personal_message(
                         {
                             "type": "error",
@@ -2,12 +2,19 @@
 JARVIS v3 Configuration
 Pydantic Settings for type-safe configuration management
 """
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import Optional
 from functools import lru_cache
 
 
 class Settings(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore",
+        frozen=True
+    )
+    
     # Application
     app_name: str = "JARVIS"
     version: str = "3.0.0"
@@ -16,12 +23,17 @@ class Settings(BaseSettings):
     # API Server
     api_host: str = "0.0.0.0"
     api_port: int = 8000
-    cors_origins: list[str] = ["http://localhost:3000", "http://192.168.10.100:3939"]
+    cors_origins: tuple[str, ...] = ("http://localhost:3000", "http://192.168.10.100:3939")
+    # Coalesce events arriving within this window into one WebSocket frame (JSON array
+    # when more than one); 0 sends every event as its own frame
+    ws_batch_window_ms: int = 0
     
     # AI - Claude
     anthropic_api_key: str
     default_model: str = "claude-sonnet-4-20250514"
+    haiku_model: str = "claude-3-5-haiku-20241022"  # Fast model for small talk
     max_tokens: int = 4096
+    history_window: int = 0  # Most recent history messages sent to Claude (0 = all)
     
     # Database
     database_url: str = "sqlite+aiosqlite:///./data/jarvis.db"
@@ -94,11 +106,6 @@ class Settings(BaseSettings):
     location_lat: float = 50.921367
     location_lon: float = -1.579752
     location_timezone: str = "Europe/London"
-    
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-        extra = "ignore"
 
 
 @lru_cache
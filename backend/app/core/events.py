@@ -4,10 +4,16 @@ Singleton event emitter for pub/sub pattern between components
 """
 import asyncio
 import logging
-from typing import Callable, Dict, List, Any, Optional
+import time
+from collections import deque
+from itertools import islice
+from typing import Callable, Dict, List, Any, Optional, Set, Tuple
 from enum import Enum
+from functools import lru_cache
 from datetime import datetime
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, field
+
+import orjson
 
 logger = logging.getLogger(__name__)
 
@@ -22,54 +28,61 @@ class EventType(Enum):
     SYSTEM = "system"
 
 
-@dataclass
+@dataclass(slots=True)
 class Event:
     """Event object"""
     type: EventType
     data: Dict[str, Any]
     timestamp: Optional[float] = None
     source: Optional[str] = None
+    _dict: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+    _json: Optional[str] = field(default=None, init=False, repr=False, compare=False)
     
     def __post_init__(self):
         if self.timestamp is None:
-            self.timestamp = datetime.now().timestamp()
+            self.timestamp = time.time()
     
     def to_dict(self) -> Dict[str, Any]:
-        """Convert event to dictionary"""
-        return {
-            "type": self.type.value,
-            "data": self.data,
-            "timestamp": self.timestamp,
-            "source": self.source
-        }
+        """Convert event to dictionary (built once; shared by history and serialization)"""
+        if self._dict is None:
+            self._dict = {
+                "type": self.type.value,
+                "data": self.data,
+                "timestamp": self.timestamp,
+                "source": self.source
+            }
+        return self._dict
+    
+    def to_json(self) -> str:
+        """Serialize event to JSON (computed once, then reused for every recipient)"""
+        if self._json is None:
+            self._json = orjson.dumps(self.to_dict()).decode()
+        return self._json
 
 
 class EventBus:
     """
-    Singleton event bus for pub/sub pattern.
+    Event bus for pub/sub pattern.
     Allows components to publish events and subscribe to event types.
+    Use get_event_bus() (or the module-level event_bus) for the shared instance.
     """
-    _instance: Optional['EventBus'] = None
-    _lock = asyncio.Lock()
-    
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance._initialized = False
-        return cls._instance
     
     def __init__(self):
-        # Only initialize once
-        if self._initialized:
-            return
-        
-        self._subscribers: Dict[EventType, List[Callable]] = {
-            event_type: [] for event_type in EventType
+        # Subscribers are stored as (callback, is_coroutine_function), classified once at
+        # subscribe time. The tuples are immutable and swapped on (un)subscribe, so publish()
+        # iterates the current reference without copying.
+        self._subscribers: Dict[EventType, Tuple[Tuple[Callable, bool], ...]] = {
+            event_type: () for event_type in EventType
         }
-        self._wildcard_subscribers: List[Callable] = []
-        self._event_history: List[Event] = []
+        self._wildcard_subscribers: Tuple[Tuple[Callable, bool], ...] = ()
+        # Companion sets for O(1) "already subscribed?" checks
+        self._subscriber_sets: Dict[EventType, Set[Callable]] = {
+            event_type: set() for event_type in EventType
+        }
+        self._wildcard_set: Set[Callable] = set()
         self._max_history = 100
-        self._initialized = True
+        # History holds each event's dict form, built once at publish time
+        self._event_history: deque[Dict[str, Any]] = deque(maxlen=self._max_history)
         
         logger.info("EventBus initialized")
     
@@ -81,8 +94,9 @@ class EventBus:
             event_type: Type of event to listen for
             callback: Async function to call when event is published
         """
-        if callback not in self._subscribers[event_type]:
-            self._subscribers[event_type].append(callback)
+        if callback not in self._subscriber_sets[event_type]:
+            self._subscriber_sets[event_type].add(callback)
+            self._subscribers[event_type] += ((callback, asyncio.iscoroutinefunction(callback)),)
             logger.info(f"Subscribed to {event_type.value} events")
     
     def subscribe_all(self, callback: Callable) -> None:
@@ -92,8 +106,9 @@ class EventBus:
         Args:
             callback: Async function to call for any event
         """
-        if callback not in self._wildcard_subscribers:
-            self._wildcard_subscribers.append(callback)
+        if callback not in self._wildcard_set:
+            self._wildcard_set.add(callback)
+            self._wildcard_subscribers += ((callback, asyncio.iscoroutinefunction(callback)),)
             logger.info("Subscribed to all events")
     
     def unsubscribe(self, event_type: EventType, callback: Callable) -> None:
@@ -104,8 +119,11 @@ class EventBus:
             event_type: Type of event to stop listening for
             callback: Callback function to remove
         """
-        if callback in self._subscribers[event_type]:
-            self._subscribers[event_type].remove(callback)
+        if callback in self._subscriber_sets[event_type]:
+            self._subscriber_sets[event_type].discard(callback)
+            self._subscribers[event_type] = tuple(
+                entry for entry in self._subscribers[event_type] if entry[0] != callback
+            )
             logger.info(f"Unsubscribed from {event_type.value} events")
     
     def unsubscribe_all(self, callback: Callable) -> None:
@@ -115,15 +133,19 @@ class EventBus:
         Args:
             callback: Callback function to remove
         """
-        if callback in self._wildcard_subscribers:
-            self._wildcard_subscribers.remove(callback)
+        if callback in self._wildcard_set:
+            self._wildcard_set.discard(callback)
+            self._wildcard_subscribers = tuple(
+                entry for entry in self._wildcard_subscribers if entry[0] != callback
+            )
             logger.info("Unsubscribed from all events")
     
     async def publish(
         self,
         event_type: EventType,
         data: Dict[str, Any],
-        source: Optional[str] = None
+        source: Optional[str] = None,
+        timestamp: Optional[float] = None
     ) -> None:
         """
         Publish an event to all subscribers.
@@ -132,42 +154,37 @@ class EventBus:
             event_type: Type of event being published
             data: Event data payload
             source: Source component that published the event
+            timestamp: Epoch seconds of the event (defaults to now)
         """
         event = Event(
             type=event_type,
             data=data,
+            timestamp=timestamp,
             source=source
         )
         
-        # Store in history
-        self._event_history.append(event)
-        if len(self._event_history) > self._max_history:
-            self._event_history.pop(0)
+        # Store in history (bounded deque evicts the oldest event)
+        self._event_history.append(event.to_dict())
         
-        logger.info(f"Publishing {event_type.value} event from {source}")
-        logger.debug(f"Event data: {data}")
+        logger.info("Publishing %s event from %s", event_type.value, source)
+        logger.debug("Event data: %r", data)
         
-        # Notify specific subscribers
-        subscribers = self._subscribers[event_type].copy()
-        for callback in subscribers:
+        # Run sync subscribers inline, then all async ones (specific and wildcard) concurrently
+        coros = []
+        for callback, is_coro in (*self._subscribers[event_type], *self._wildcard_subscribers):
+            if is_coro:
+                coros.append(callback(event))
+                continue
             try:
-                if asyncio.iscoroutinefunction(callback):
-                    await callback(event)
-                else:
-                    callback(event)
+                callback(event)
             except Exception as e:
                 logger.error(f"Error in event subscriber: {e}", exc_info=True)
         
-        # Notify wildcard subscribers
-        wildcard = self._wildcard_subscribers.copy()
-        for callback in wildcard:
-            try:
-                if asyncio.iscoroutinefunction(callback):
-                    await callback(event)
-                else:
-                    callback(event)
-            except Exception as e:
-                logger.error(f"Error in wildcard subscriber: {e}", exc_info=True)
+        if coros:
+            results = await asyncio.gather(*coros, return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception):
+                    logger.error(f"Error in event subscriber: {result}", exc_info=result)
     
     def get_history(self, limit: int = 10) -> List[Dict[str, Any]]:
         """
@@ -179,7 +196,8 @@ class EventBus:
         Returns:
             List of recent events as dictionaries
         """
-        return [event.to_dict() for event in self._event_history[-limit:]]
+        start = max(0, len(self._event_history) - limit)
+        return list(islice(self._event_history, start, None))
     
     def get_subscribers_count(self) -> Dict[str, int]:
         """Get count of subscribers per event type"""
@@ -194,34 +212,44 @@ class EventBus:
         logger.info("Event history cleared")
 
 
+@lru_cache
+def get_event_bus() -> EventBus:
+    """Get the shared event bus"""
+    return EventBus()
+
+
 # Global instance
-event_bus = EventBus()
+event_bus = get_event_bus()
 
 
 # Helper functions
 async def publish_doorbell_event(camera_name: str, event_data: Dict[str, Any]) -> None:
     """Publish a doorbell ring event"""
+    now = datetime.now()
     await event_bus.publish(
         EventType.DOORBELL,
         {
             "camera_name": camera_name,
             "event": event_data,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now.isoformat()
         },
-        source="unifi_protect"
+        source="unifi_protect",
+        timestamp=now.timestamp()
     )
 
 
 async def publish_motion_event(camera_name: str, event_data: Dict[str, Any]) -> None:
     """Publish a motion detection event"""
+    now = datetime.now()
     await event_bus.publish(
         EventType.MOTION,
         {
             "camera_name": camera_name,
             "event": event_data,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now.isoformat()
         },
-        source="unifi_protect"
+        source="unifi_protect",
+        timestamp=now.timestamp()
     )
 
 
@@ -2,10 +2,14 @@
 JARVIS Orchestrator Agent
 Handles Claude API interactions with tool use
 """
-import json
+import asyncio
 import logging
-from typing import AsyncGenerator, Dict, Any, List, Optional
-from anthropic import AsyncAnthropic
+import re
+import time
+from typing import AsyncGenerator, Dict, Any, List, Optional, Tuple
+
+import httpx
+import orjson
 
 from app.config.settings import get_settings
 from app.tools.registry import tool_registry
@@ -14,6 +18,50 @@ from app.tools.base import ToolDomain
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+NO_RESPONSE_TEXT = "I apologize, but I couldn't generate a response."
+
+# Results of cacheable (read-only) tools are reused for identical calls within this
+# window - Claude often repeats a query within a turn
+TOOL_CACHE_TTL = 5.0
+TOOL_CACHE_SIZE = 512
+
+# Small talk ("hi", "thanks") is answered by the fast model with no tools. Only messages
+# that are entirely chit-chat qualify; anything else (a host, device or service name
+# included) goes to the full model with tools so answers are backed by real data.
+SIMPLE_MAX_TOKENS = 256
+SIMPLE_SYSTEM_PROMPT = "You are JARVIS, Paul's AI assistant. Be brief and conversational, no markdown."
+_SMALL_TALK = re.compile(
+    r"(?:(?:hey|hi|ok|okay|thanks|thank you)\s+)?(?:jarvis\s*)?"
+    r"(?:hi|hello|hey|hiya|yo|howdy|greetings|"
+    r"(?:good\s+)?(?:morning|afternoon|evening|night)|goodnight|"
+    r"thanks?(?:\s+you)?(?:\s+(?:so|very)\s+much)?|thx|ty|cheers|much appreciated|"
+    r"ok|okay|k|cool|nice|great|awesome|perfect|got it|sounds good|never ?mind|nvm|"
+    r"yes|yeah|yep|yup|no|nope|nah|sure|"
+    r"bye|goodbye|see (?:you|ya)(?: later)?|later|"
+    r"who are you|what(?:'?s| is) your name|how are you(?: doing)?|how'?s it going|what'?s up)"
+    r"(?:\s*,?\s*jarvis)?",
+    re.IGNORECASE
+)
+_SMALL_TALK_STRIP = " \t\r\n.,!?:)(-~'\""
+
+
+def _is_plain_user_turn(message: Dict) -> bool:
+    """Check if a history message is a user turn that doesn't carry tool results"""
+    if message.get("role") != "user":
+        return False
+    content = message.get("content")
+    if isinstance(content, list):
+        return not any(
+            (block.get("type") if isinstance(block, dict) else getattr(block, "type", None)) == "tool_result"
+            for block in content
+        )
+    return True
+
+
+def _dumps(obj: Any) -> str:
+    """Serialize a tool result for Claude (tools may return dicts with non-string keys)"""
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
 
 class JarvisOrchestrator:
     """
@@ -75,13 +123,96 @@ Be concise and direct. Use available tools when needed."""
     }
     
     def __init__(self):
-        self.client = AsyncAnthropic(api_key=settings.anthropic_api_key)
+        # Imported here: the SDK is slow to import, and the orchestrator is only built
+        # on the first chat request (see get_orchestrator)
+        from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient
+        
+        # One long-lived HTTP/2 connection carries every call of the tool loop, so
+        # follow-up requests skip connection setup and TLS handshakes
+        self.client = AsyncAnthropic(
+            api_key=settings.anthropic_api_key,
+            http_client=DefaultAsyncHttpxClient(
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=32, keepalive_expiry=300),
+                timeout=httpx.Timeout(600.0, connect=3.0)
+            )
+        )
         self.model = settings.default_model
         self.max_tokens = settings.max_tokens
+        
+        # The tool set is fixed once discovery has run, so each tool name is bound
+        # straight to its execute method: a tool call is one dict lookup and an await
+        tools_by_name = tool_registry.snapshot()
+        self._executors = {name: tool.execute for name, tool in tools_by_name.items()}
+        self._cacheable = {
+            name for name, tool in tools_by_name.items()
+            if tool.cacheable and not tool.requires_confirmation
+        }
+        # (tool name, canonical input JSON) -> (monotonic time, serialized result)
+        self._tool_cache: Dict[Tuple[str, bytes], Tuple[float, str]] = {}
+        # Bumped whenever a state-changing tool starts or finishes; a read only caches
+        # its result if no write overlapped it (tools in one turn run concurrently)
+        self._tool_cache_generation = 0
+        
+        # Per-domain system prompt blocks and tool schemas, built once. The orchestrator is
+        # created on first request (see get_orchestrator), after tools are discovered.
+        self._system_cache: Dict[ToolDomain, List[Dict[str, Any]]] = {}
+        self._tools_cache: Dict[ToolDomain, List[Dict[str, Any]]] = {}
+        for domain in ToolDomain:
+            text = self.SYSTEM_PROMPTS.get(domain, self.SYSTEM_PROMPTS[ToolDomain.UTILITIES])
+            # Cache breakpoints let the tools + system prefix be served from Anthropic's
+            # prompt cache on every turn of the tool loop
+            self._system_cache[domain] = [
+                {"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}
+            ]
+            
+            tools = tool_registry.get_schemas_for_domain(domain)
+            if domain != ToolDomain.UTILITIES:
+                tools += tool_registry.get_schemas_for_domain(ToolDomain.UTILITIES)
+            if tools:
+                tools[-1] = {**tools[-1], "cache_control": {"type": "ephemeral"}}
+            self._tools_cache[domain] = tools
+    
+    def get_system_prompt(self, domain: ToolDomain) -> List[Dict[str, Any]]:
+        """Get system prompt blocks for a domain"""
+        return self._system_cache[domain]
+    
+    def _tools_for(self, domain: ToolDomain) -> List[Dict[str, Any]]:
+        """Get tool schemas for a domain (plus utilities)"""
+        return self._tools_cache[domain]
+    
+    @staticmethod
+    def _build_messages(message: str, conversation_history: Optional[List[Dict]]) -> List[Dict]:
+        """
+        Build the request messages in a single pass: the (optionally windowed)
+        history followed by the new user turn. The caller's list is never mutated.
+        """
+        history = conversation_history or ()
+        if settings.history_window > 0 and len(history) > settings.history_window:
+            start = len(history) - settings.history_window
+            # Claude requires the first message to be a user turn, and a tool_result
+            # can't be separated from its tool_use: start at the next plain user turn
+            while start < len(history) and not _is_plain_user_turn(history[start]):
+                start += 1
+            history = history[start:]
+        return [*history, {"role": "user", "content": message}]
     
-    def get_system_prompt(self, domain: ToolDomain) -> str:
-        """Get system prompt for a domain"""
-        return self.SYSTEM_PROMPTS.get(domain, self.SYSTEM_PROMPTS[ToolDomain.UTILITIES])
+    @staticmethod
+    def _is_simple(message: str, conversation_history: Optional[List[Dict]]) -> bool:
+        """
+        Check if a message is small talk that can skip the tool loop.
+        
+        A short reply to a question from JARVIS ("yes", "go ahead") is never simple,
+        since it may be confirming a tool action.
+        """
+        if not _SMALL_TALK.fullmatch(message.strip(_SMALL_TALK_STRIP)):
+            return False
+        if conversation_history:
+            last = conversation_history[-1]
+            content = last.get("content")
+            if last.get("role") == "assistant" and isinstance(content, str) and content.rstrip().endswith("?"):
+                return False
+        return True
     
     async def process(
         self,
@@ -104,11 +235,20 @@ Be concise and direct. Use available tools when needed."""
             domain = ToolDomain(domain)
         
         # Get tools for domain
-        tools = tool_registry.get_schemas_for_domain(domain) + tool_registry.get_schemas_for_domain(ToolDomain.UTILITIES)
+        tools = self._tools_for(domain)
         
         # Build messages
-        messages = conversation_history.copy() if conversation_history else []
-        messages.append({"role": "user", "content": message})
+        messages = self._build_messages(message, conversation_history)
+        
+        # Small talk: fast model, no tools, no tool loop
+        if self._is_simple(message, conversation_history):
+            response = await self.client.messages.create(
+                model=settings.haiku_model,
+                max_tokens=SIMPLE_MAX_TOKENS,
+                system=SIMPLE_SYSTEM_PROMPT,
+                messages=messages
+            )
+            return self._response_text(response)
         
         # Initial Claude call
         response = await self.client.messages.create(
@@ -137,11 +277,15 @@ Be concise and direct. Use available tools when needed."""
             )
         
         # Extract final text response
-        for block in response.content:
-            if hasattr(block, "text"):
-                return block.text
-        
-        return "I apologize, but I couldn't generate a response."
+        return self._response_text(response)
+    
+    @staticmethod
+    def _response_text(response) -> str:
+        """Get the first text block of a response"""
+        return next(
+            (block.text for block in response.content if getattr(block, "type", None) == "text"),
+            NO_RESPONSE_TEXT
+        )
     
     async def process_stream(
         self,
@@ -157,19 +301,41 @@ Be concise and direct. Use available tools when needed."""
             - {"type": "text", "content": "..."} for text chunks
             - {"type": "tool_use", "name": "...", "input": {...}} for tool calls
             - {"type": "tool_result", "name": "...", "result": {...}} for results
-            - {"type": "done", "usage": {...}} when complete
+            - {"type": "done", "usage": {"model": ..., "input_tokens": ..., "output_tokens": ...}} when complete
         """
         if isinstance(domain, str):
             domain = ToolDomain(domain)
         
-        tools = tool_registry.get_schemas_for_domain(domain) + tool_registry.get_schemas_for_domain(ToolDomain.UTILITIES)
-        messages = conversation_history.copy() if conversation_history else []
-        messages.append({"role": "user", "content": message})
+        tools = self._tools_for(domain)
+        messages = self._build_messages(message, conversation_history)
+        
+        # Small talk: stream from the fast model with no tools
+        if self._is_simple(message, conversation_history):
+            async with self.client.messages.stream(
+                model=settings.haiku_model,
+                max_tokens=SIMPLE_MAX_TOKENS,
+                system=SIMPLE_SYSTEM_PROMPT,
+                messages=messages
+            ) as stream:
+                async for text in stream.text_stream:
+                    yield {"type": "text", "content": text}
+                final_message = await stream.get_final_message()
+            
+            yield {
+                "type": "done",
+                "usage": {
+                    "model": settings.haiku_model,
+                    "input_tokens": final_message.usage.input_tokens,
+                    "output_tokens": final_message.usage.output_tokens
+                }
+            }
+            return
         
         while True:
             # Stream response
             current_tool = None
-            tool_input_json = ""
+            # Tool input arrives as JSON fragments; collect them and join once at block stop
+            tool_input_chunks: List[str] = []
             response_content = []
             
             async with self.client.messages.stream(
@@ -187,20 +353,21 @@ Be concise and direct. Use available tools when needed."""
                                     "id": event.content_block.id,
                                     "name": event.content_block.name
                                 }
-                                tool_input_json = ""
+                                tool_input_chunks = []
                     
                     elif event.type == "content_block_delta":
                         if hasattr(event.delta, "text"):
                             yield {"type": "text", "content": event.delta.text}
                         
                         elif hasattr(event.delta, "partial_json"):
-                            tool_input_json += event.delta.partial_json
+                            tool_input_chunks.append(event.delta.partial_json)
                     
                     elif event.type == "content_block_stop":
                         if current_tool:
                             try:
-                                tool_input = json.loads(tool_input_json) if tool_input_json else {}
-                            except json.JSONDecodeError:
+                                tool_input_json = "".join(tool_input_chunks)
+                                tool_input = orjson.loads(tool_input_json) if tool_input_json else {}
+                            except orjson.JSONDecodeError:
                                 tool_input = {}
                             
                             yield {
@@ -222,15 +389,27 @@ Be concise and direct. Use available tools when needed."""
             
             # Check if we need to execute tools
             if final_message.stop_reason == "tool_use":
-                tool_results = await self._execute_tools(final_message.content)
+                # Run tools concurrently and yield each result as soon as it lands,
+                # rather than holding every result until the slowest tool finishes
+                tasks = [
+                    asyncio.ensure_future(self._run_tool(block))
+                    for block in final_message.content
+                    if getattr(block, "type", None) == "tool_use"
+                ]
+                try:
+                    for next_done in asyncio.as_completed(tasks):
+                        result = await next_done
+                        yield {
+                            "type": "tool_result",
+                            "tool_use_id": result["tool_use_id"],
+                            "result": result["content"]
+                        }
+                finally:
+                    for task in tasks:
+                        task.cancel()
                 
-                # Yield tool results
-                for result in tool_results:
-                    yield {
-                        "type": "tool_result",
-                        "tool_use_id": result["tool_use_id"],
-                        "result": result["content"]
-                    }
+                # Claude expects results in tool_use order
+                tool_results = [task.result() for task in tasks]
                 
                 # Continue conversation
                 messages.append({"role": "assistant", "content": final_message.content})
@@ -240,6 +419,7 @@ Be concise and direct. Use available tools when needed."""
                 yield {
                     "type": "done",
                     "usage": {
+                        "model": self.model,
                         "input_tokens": final_message.usage.input_tokens,
                         "output_tokens": final_message.usage.output_tokens
                     }
@@ -247,31 +427,69 @@ Be concise and direct. Use available tools when needed."""
                 break
     
     async def _execute_tools(self, content: List) -> List[Dict]:
-        """Execute tool calls from Claude response"""
-        results = []
+        """Execute tool calls from Claude response concurrently, keeping result order"""
+        blocks = [block for block in content if getattr(block, "type", None) == "tool_use"]
+        return list(await asyncio.gather(*(self._run_tool(block) for block in blocks)))
+    
+    async def _run_tool(self, block) -> Dict:
+        """Execute a single tool_use block and wrap its output as a tool_result"""
+        tool_name = block.name
+        tool_input = getattr(block, "input", None) or {}
         
-        for block in content:
-            if hasattr(block, "type") and block.type == "tool_use":
-                tool_name = block.name
-                tool_input = block.input if hasattr(block, "input") else {}
-                
-                logger.info(f"Executing tool: {tool_name}", extra={"input": tool_input})
-                
-                tool = tool_registry.get_tool(tool_name)
-                if tool:
-                    try:
-                        result = await tool.execute(**tool_input)
-                        result_str = json.dumps(result)
-                    except Exception as e:
-                        logger.error(f"Tool {tool_name} failed: {e}")
-                        result_str = json.dumps({"error": str(e)})
-                else:
-                    result_str = json.dumps({"error": f"Unknown tool: {tool_name}"})
-                
-                results.append({
+        cache_key = None
+        if tool_name in self._cacheable:
+            cache_key = (tool_name, orjson.dumps(tool_input, option=orjson.OPT_SORT_KEYS))
+            entry = self._tool_cache.get(cache_key)
+            if entry and time.monotonic() - entry[0] < TOOL_CACHE_TTL:
+                logger.info("Using cached result for tool: %s", tool_name)
+                return {
                     "type": "tool_result",
                     "tool_use_id": block.id,
-                    "content": result_str
-                })
+                    "content": entry[1]
+                }
+        
+        logger.info("Executing tool: %s", tool_name, extra={"input": tool_input})
+        
+        execute = self._executors.get(tool_name)
+        if execute:
+            if cache_key is None:
+                # A tool that may change state makes every cached read suspect
+                self._tool_cache_generation += 1
+            generation = self._tool_cache_generation
+            try:
+                result = await execute(**tool_input)
+                result_str = _dumps(result)
+                if (
+                    cache_key is not None
+                    and generation == self._tool_cache_generation
+                    and isinstance(result, dict)
+                    and result.get("success")
+                ):
+                    self._cache_tool_result(cache_key, result_str)
+            except Exception as e:
+                logger.error(f"Tool {tool_name} failed: {e}")
+                result_str = _dumps({"error": str(e)})
+            finally:
+                if cache_key is None:
+                    self._tool_cache.clear()
+                    self._tool_cache_generation += 1
+        else:
+            result_str = _dumps({"error": f"Unknown tool: {tool_name}"})
         
-        return results
+        return {
+            "type": "tool_result",
+            "tool_use_id": block.id,
+            "content": result_str
+        }
+    
+    def _cache_tool_result(self, key: Tuple[str, bytes], result_str: str) -> None:
+        """Store a tool result, evicting the oldest entry once the cache is full"""
+        cache = self._tool_cache
+        cache.pop(key, None)
+        if len(cache) >= TOOL_CACHE_SIZE:
+            del cache[next(iter(cache))]
+        cache[key] = (time.monotonic(), result_str)
+    
+    async def close(self) -> None:
+        """Close the Anthropic client's HTTP connections"""
+        await self.client.close()
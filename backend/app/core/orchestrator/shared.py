@@ -12,3 +12,9 @@ def get_orchestrator() -> JarvisOrchestrator:
     if _orchestrator is None:
         _orchestrator = JarvisOrchestrator()
     return _orchestrator
+
+
+async def close_orchestrator() -> None:
+    """Close the shared orchestrator's connections (call on shutdown)"""
+    if _orchestrator is not None:
+        await _orchestrator.close()
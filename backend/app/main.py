@@ -2,27 +2,35 @@
 JARVIS v3 - FastAPI Application
 Main entry point for the Python backend
 """
+import asyncio
+import gzip
 import logging
+import mimetypes
+import os
 from contextlib import asynccontextmanager
-from typing import Optional
+from typing import Dict, Optional, Tuple
 from pathlib import Path
 
 from fastapi import FastAPI, HTTPException, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
+from starlette.datastructures import Headers
+from starlette.staticfiles import NotModifiedResponse
 
 from app.config.settings import get_settings
 from app.tools.registry import tool_registry
 from app.tools.base import ToolDomain
-from app.core.orchestrator.shared import get_orchestrator
+from app.tools.http_client import close_http_clients
+from app.core.orchestrator.shared import get_orchestrator, close_orchestrator
 from app.api.websocket.handlers import websocket_endpoint, connection_manager
 from app.core.events import event_bus
 from app.api.v1.webhooks import router as webhook_router
-from app.api.v1.compatibility import router as compatibility_router
+from app.api.v1.compatibility import router as compatibility_router, init_compat_db, close_tts_client
+from app.api.sse import SSE_QUEUE_SIZE, coalesce_text, drain_orchestrator, sse
 
-from app.api.v1.integrations import router as integrations_router
+from app.api.v1.integrations import router as integrations_router, close_http_session
 from app.models.conversations import init_db
 # Configure logging
 logging.basicConfig(
@@ -45,11 +53,20 @@ async def lifespan(app: FastAPI):
     await init_db()
     logger.info("Conversation database initialized")
 
+    # Ensure settings/cost tables and their indexes exist
+    await asyncio.to_thread(init_compat_db)
+    logger.info("Settings and cost database initialized")
+
     # Auto-discover tools
     count = tool_registry.auto_discover()
     logger.info(f"Registered {count} tools")
     logger.info(f"Tools by domain: {tool_registry.count_by_domain()}")
 
+    # Gzip frontend assets once so they're served without per-request compression
+    if static_files is not None:
+        gzipped = await asyncio.to_thread(static_files.precompress)
+        logger.info(f"Precompressed {gzipped} static files")
+
     # Initialize event bus and WebSocket manager
     logger.info(f"Event bus initialized with subscribers: {event_bus.get_subscribers_count()}")
     logger.info(f"WebSocket manager ready")
@@ -58,6 +75,10 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     logger.info("Shutting down JARVIS v3...")
+    await close_tts_client()
+    await close_http_session()
+    await close_orchestrator()
+    await close_http_clients()
 
 
 # Create FastAPI app
@@ -173,14 +194,24 @@ async def list_tools_by_domain(domain: str):
 async def chat(request: ChatRequest):
     """Process a chat message"""
     if request.stream:
-        # Return streaming response
+        # Return streaming response. As in /api/chat/v2, the orchestrator feeds a
+        # bounded queue, so a slow client backs up the producer rather than memory,
+        # and consecutive text chunks are merged into one frame.
         async def generate():
-            async for chunk in get_orchestrator().process_stream(
-                message=request.message,
-                domain=request.domain
-            ):
-                import json
-                yield f"data: {json.dumps(chunk)}\n\n"
+            queue: asyncio.Queue = asyncio.Queue(maxsize=SSE_QUEUE_SIZE)
+            producer = asyncio.create_task(drain_orchestrator(
+                queue,
+                get_orchestrator().process_stream(
+                    message=request.message,
+                    domain=request.domain
+                )
+            ))
+            try:
+                async for chunk in coalesce_text(queue):
+                    yield sse(chunk)
+            finally:
+                # Stop the orchestrator if the client disconnected mid-stream
+                producer.cancel()
 
         return StreamingResponse(
             generate(),
@@ -225,11 +256,84 @@ async def websocket_stats():
     return connection_manager.get_stats()
 
 
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles that serves a gzipped copy of text assets to clients accepting gzip.
+    
+    Copies are written next to the originals by precompress() at startup; an asset
+    edited after that is served uncompressed until the next restart.
+    """
+    
+    COMPRESSIBLE_SUFFIXES = (".html", ".js", ".css", ".svg", ".json", ".txt")
+    MIN_SIZE = 512
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Real path of each original -> (gzip path, gzip stat)
+        self._gzipped: Dict[str, Tuple[str, os.stat_result]] = {}
+    
+    def precompress(self) -> int:
+        """
+        Write (or refresh) a .gz copy of every compressible asset.
+        
+        Returns:
+            Number of assets with an up-to-date gzip copy
+        """
+        for root, _, files in os.walk(self.directory):
+            for filename in files:
+                if not filename.endswith(self.COMPRESSIBLE_SUFFIXES):
+                    continue
+                
+                path = os.path.join(root, filename)
+                gz_path = path + ".gz"
+                try:
+                    source_stat = os.stat(path)
+                    if source_stat.st_size < self.MIN_SIZE:
+                        continue
+                    if not os.path.exists(gz_path) or os.stat(gz_path).st_mtime < source_stat.st_mtime:
+                        with open(path, "rb") as f:
+                            data = gzip.compress(f.read(), compresslevel=9)
+                        tmp_path = gz_path + ".tmp"
+                        with open(tmp_path, "wb") as f:
+                            f.write(data)
+                        os.replace(tmp_path, gz_path)
+                    self._gzipped[os.path.realpath(path)] = (gz_path, os.stat(gz_path))
+                except OSError as e:
+                    logger.warning(f"Could not precompress {path}: {e}")
+        
+        return len(self._gzipped)
+    
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        gzipped = self._gzipped.get(str(full_path))
+        if gzipped is None:
+            return super().file_response(full_path, stat_result, scope, status_code)
+        
+        request_headers = Headers(scope=scope)
+        gz_path, gz_stat = gzipped
+        if "gzip" not in request_headers.get("accept-encoding", "") or gz_stat.st_mtime < stat_result.st_mtime:
+            response = super().file_response(full_path, stat_result, scope, status_code)
+            response.headers["Vary"] = "Accept-Encoding"
+            return response
+        
+        response = FileResponse(
+            gz_path,
+            status_code=status_code,
+            stat_result=gz_stat,
+            media_type=mimetypes.guess_type(str(full_path))[0] or "text/plain",
+            headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"}
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
 # Mount static files for frontend (must be last)
 # Serve the existing JARVIS frontend from /opt/jarvis-v3/frontend/web/
 static_path = Path("/opt/jarvis-v3/frontend/web")
+static_files: Optional[PrecompressedStaticFiles] = None
 if static_path.exists():
-    app.mount("/", StaticFiles(directory=str(static_path), html=True), name="static")
+    static_files = PrecompressedStaticFiles(directory=str(static_path), html=True)
+    app.mount("/", static_files, name="static")
     logger.info(f"Mounted static files from {static_path}")
 else:
     logger.warning(f"Static files directory not found: {static_path}")
@@ -241,5 +345,13 @@ if __name__ == "__main__":
         "app.main:app",
         host=settings.api_host,
         port=settings.api_port,
-        reload=True
+        reload=settings.debug,
+        # uvloop and httptools come with uvicorn[standard]
+        loop="uvloop",
+        http="httptools",
+        # Let clients reuse connections across chat turns
+        timeout_keep_alive=75,
+        # Broadcast frames are small JSON; per-connection deflate would recompress
+        # the same payload once per client
+        ws_per_message_deflate=False
     )
@@ -6,17 +6,17 @@ import uuid
 from datetime import datetime
 from typing import List, Optional
 
-from sqlalchemy import Column, String, DateTime, Text, ForeignKey
+from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Index, LargeBinary, TypeDecorator, event, update, delete
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, selectinload
 from sqlalchemy.future import select
 
 Base = declarative_base()
 
 # Database engine and session factory
 DATABASE_URL = "sqlite+aiosqlite:////opt/jarvis-v3/backend/data/conversations.db"
-engine = create_async_engine(DATABASE_URL, echo=False)
+engine = create_async_engine(DATABASE_URL, echo=False, connect_args={"timeout": 30})
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
@@ -24,19 +24,61 @@ AsyncSessionLocal = async_sessionmaker(
 )
 
 
+@event.listens_for(engine.sync_engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Enable WAL so each message commit appends to the log instead of syncing the database"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+class UUIDType(TypeDecorator):
+    """
+    UUID stored as 16 raw bytes; Python code keeps using the canonical string form
+    """
+    impl = LargeBinary(16)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, bytes):
+            return value
+        if isinstance(value, uuid.UUID):
+            return value.bytes
+        try:
+            return uuid.UUID(value).bytes
+        except ValueError:
+            # Not a UUID, so it can't match any row - bind it as-is rather than erroring
+            return str(value).encode()
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return str(uuid.UUID(bytes=value))
+
+
 class Conversation(Base):
     """
     Conversation container - tracks an entire conversation thread
     """
     __tablename__ = 'conversations'
 
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(UUIDType, primary_key=True, default=lambda: str(uuid.uuid4()))
     title = Column(String(500), nullable=True)  # Auto-generated from first message
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
-    # Relationship to messages
-    messages = relationship("Message", back_populates="conversation", order_by="Message.created_at")
+    # Relationship to messages (deleted with the conversation by the database)
+    messages = relationship(
+        "Message",
+        back_populates="conversation",
+        order_by="Message.created_at",
+        cascade="all, delete-orphan",
+        passive_deletes=True
+    )
 
     def to_dict(self):
         """Convert to dictionary for API responses"""
@@ -48,14 +90,18 @@ class Conversation(Base):
         }
 
 
+# Most-recent-first listing (list_conversations)
+Index("ix_conversations_updated", Conversation.updated_at.desc())
+
+
 class Message(Base):
     """
     Individual message within a conversation
     """
     __tablename__ = 'messages'
 
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    conversation_id = Column(String(36), ForeignKey('conversations.id'), nullable=False)
+    id = Column(UUIDType, primary_key=True, default=lambda: str(uuid.uuid4()))
+    conversation_id = Column(UUIDType, ForeignKey('conversations.id', ondelete="CASCADE"), nullable=False)
     role = Column(String(20), nullable=False)  # 'user' or 'assistant'
     content = Column(Text, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -63,6 +109,11 @@ class Message(Base):
     # Relationship to conversation
     conversation = relationship("Conversation", back_populates="messages")
 
+    __table_args__ = (
+        # A conversation's messages in order (get_conversation, get_conversation_messages)
+        Index("ix_messages_conv_created", "conversation_id", "created_at"),
+    )
+
     def to_dict(self):
         """Convert to dictionary for API responses"""
         return {
@@ -85,10 +136,44 @@ class Message(Base):
 # Database Helper Functions
 # ============================================================================
 
+def _migrate_text_ids(connection) -> None:
+    """Convert ids written as 36-char text by older versions to 16-byte UUIDs"""
+    def to_bytes(rows):
+        return [(uuid.UUID(old).bytes, old) for (old,) in rows]
+
+    conversation_ids = to_bytes(connection.exec_driver_sql(
+        "SELECT id FROM conversations WHERE typeof(id) = 'text'"
+    ).fetchall())
+    message_ids = to_bytes(connection.exec_driver_sql(
+        "SELECT id FROM messages WHERE typeof(id) = 'text'"
+    ).fetchall())
+    if not conversation_ids and not message_ids:
+        return
+
+    # Parent and child keys change together; check the FK only at commit
+    connection.exec_driver_sql("PRAGMA defer_foreign_keys=ON")
+    if conversation_ids:
+        connection.exec_driver_sql("UPDATE conversations SET id = ? WHERE id = ?", conversation_ids)
+        connection.exec_driver_sql(
+            "UPDATE messages SET conversation_id = ? WHERE conversation_id = ?", conversation_ids
+        )
+    if message_ids:
+        connection.exec_driver_sql("UPDATE messages SET id = ? WHERE id = ?", message_ids)
+
+
+def _create_all(connection) -> None:
+    """Create missing tables and indexes (indexes are added to existing tables too)"""
+    Base.metadata.create_all(bind=connection)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=connection, checkfirst=True)
+    _migrate_text_ids(connection)
+
+
 async def init_db():
     """Initialize database tables"""
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_create_all)
 
 
 async def get_db_session() -> AsyncSession:
@@ -99,30 +184,30 @@ async def get_db_session() -> AsyncSession:
 
 async def create_conversation(title: Optional[str] = None) -> Conversation:
     """Create a new conversation"""
+    now = datetime.utcnow()
     async with AsyncSessionLocal() as session:
+        # Timestamps are set here so the row needn't be re-read after the INSERT
         conversation = Conversation(
             id=str(uuid.uuid4()),
-            title=title
+            title=title,
+            created_at=now,
+            updated_at=now
         )
         session.add(conversation)
         await session.commit()
-        await session.refresh(conversation)
         return conversation
 
 
 async def get_conversation(conversation_id: str) -> Optional[Conversation]:
     """Get conversation by ID with all messages"""
     async with AsyncSessionLocal() as session:
+        # Messages are eagerly loaded with the conversation (ordered by created_at)
         result = await session.execute(
-            select(Conversation).where(Conversation.id == conversation_id)
+            select(Conversation)
+            .options(selectinload(Conversation.messages))
+            .where(Conversation.id == conversation_id)
         )
-        conversation = result.scalar_one_or_none()
-        
-        if conversation:
-            # Eagerly load messages
-            await session.refresh(conversation, ['messages'])
-        
-        return conversation
+        return result.scalar_one_or_none()
 
 
 async def list_conversations(limit: int = 50, offset: int = 0) -> List[Conversation]:
@@ -144,22 +229,25 @@ async def add_message(
     content: str
 ) -> Message:
     """Add a message to a conversation"""
+    now = datetime.utcnow()
     async with AsyncSessionLocal() as session:
         message = Message(
             id=str(uuid.uuid4()),
             conversation_id=conversation_id,
             role=role,
-            content=content
+            content=content,
+            created_at=now
         )
         session.add(message)
         
-        # Update conversation's updated_at timestamp
-        conversation = await session.get(Conversation, conversation_id)
-        if conversation:
-            conversation.updated_at = datetime.utcnow()
+        # Bump the conversation's updated_at in the same transaction as the INSERT
+        await session.execute(
+            update(Conversation)
+            .where(Conversation.id == conversation_id)
+            .values(updated_at=now)
+        )
         
         await session.commit()
-        await session.refresh(message)
         return message
 
 
@@ -178,21 +266,21 @@ async def get_conversation_messages(conversation_id: str) -> List[Message]:
 async def update_conversation_title(conversation_id: str, title: str) -> bool:
     """Update conversation title"""
     async with AsyncSessionLocal() as session:
-        conversation = await session.get(Conversation, conversation_id)
-        if conversation:
-            conversation.title = title
-            conversation.updated_at = datetime.utcnow()
-            await session.commit()
-            return True
-        return False
+        result = await session.execute(
+            update(Conversation)
+            .where(Conversation.id == conversation_id)
+            .values(title=title, updated_at=datetime.utcnow())
+        )
+        await session.commit()
+        return result.rowcount > 0
 
 
 async def delete_conversation(conversation_id: str) -> bool:
     """Delete a conversation and all its messages"""
     async with AsyncSessionLocal() as session:
-        conversation = await session.get(Conversation, conversation_id)
-        if conversation:
-            await session.delete(conversation)
-            await session.commit()
-            return True
-        return False
+        # Messages are deleted explicitly too: tables created before the FK gained
+        # ON DELETE CASCADE don't cascade on their own
+        await session.execute(delete(Message).where(Message.conversation_id == conversation_id))
+        result = await session.execute(delete(Conversation).where(Conversation.id == conversation_id))
+        await session.commit()
+        return result.rowcount > 0
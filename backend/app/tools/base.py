@@ -3,6 +3,7 @@ Base Tool class for JARVIS v3
 All tools inherit from BaseTool and implement the execute method
 """
 from abc import ABC, abstractmethod
+from functools import cached_property
 from typing import Dict, Any, List, Optional
 from pydantic import BaseModel
 from enum import Enum
@@ -37,6 +38,9 @@ class BaseTool(ABC):
     - domain: Which domain this tool belongs to
     - parameters: List of ToolParameter definitions
     
+    Read-only tools may set cacheable = True so the orchestrator can answer a
+    repeated call with the same input from a short-lived cache.
+    
     And implement:
     - execute(**kwargs): Async method to run the tool
     """
@@ -46,6 +50,7 @@ class BaseTool(ABC):
     domain: ToolDomain
     parameters: List[ToolParameter] = []
     requires_confirmation: bool = False  # For destructive actions
+    cacheable: bool = False  # Read-only: identical calls may reuse a result for a few seconds
     
     @abstractmethod
     async def execute(self, **kwargs) -> Dict[str, Any]:
@@ -59,11 +64,16 @@ class BaseTool(ABC):
     
     def to_claude_schema(self) -> Dict[str, Any]:
         """
-        Generate Claude API tool use schema.
+        Get Claude API tool use schema.
         
         Returns:
-            Dict in Claude tool format
+            Dict in Claude tool format (shared - do not mutate)
         """
+        return self.claude_schema
+    
+    @cached_property
+    def claude_schema(self) -> Dict[str, Any]:
+        """Claude tool schema, built once per tool instance from its parameters"""
         properties = {}
         required = []
         
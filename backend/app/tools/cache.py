@@ -0,0 +1,77 @@
+"""
+Response cache for JARVIS v3 tools
+Short-lived cache for slowly-changing upstream API responses
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+class AsyncTTLCache:
+    """
+    Async cache of fetched values, each kept for its own TTL.
+
+    Concurrent misses for the same key wait on a single fetch instead of all
+    hitting the upstream API. Failed fetches are not cached.
+    """
+
+    def __init__(self):
+        # key -> (monotonic expiry, value)
+        self._entries: Dict[str, Tuple[float, Any]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def get_or_fetch(self, key: str, ttl: float, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Get a cached value, fetching and caching it if missing or expired.
+
+        Args:
+            key: Cache key (e.g. "adguard:/control/stats")
+            ttl: Seconds a freshly fetched value stays valid
+            fetch: Zero-argument coroutine function producing the value
+
+        Returns:
+            The cached or freshly fetched value (shared - do not mutate)
+        """
+        entry = self._entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+
+        # Single-flight: concurrent misses for the same key wait on one fetch
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+
+            self.misses += 1
+            value = await fetch()
+            self._entries[key] = (time.monotonic() + ttl, value)
+            return value
+
+    def peek(self, key: str) -> Any:
+        """Get a cached value without fetching (None if missing or expired)"""
+        entry = self._entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+        return None
+
+    def invalidate(self, key: str) -> None:
+        """Drop a cached value (e.g. after changing it upstream)"""
+        self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        """Get hit/miss counters and the current number of entries"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries)
+        }
+
+
+# Shared cache for tool API responses
+response_cache = AsyncTTLCache()
@@ -2,15 +2,38 @@
 AdGuard Home Tool for JARVIS v3
 Query AdGuard Home for DNS stats, blocked queries, and filtering status
 """
+import asyncio
+import heapq
 import httpx
-from typing import Dict, Any
+from itertools import chain
+from operator import itemgetter
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 from base64 import b64encode
 
 from app.tools.base import BaseTool, ToolParameter, ToolDomain
+from app.tools.cache import response_cache
+from app.tools.http_client import get_http_client, json_body
 from app.config.settings import get_settings
 
 settings = get_settings()
 
+TOP_N = 10
+
+# Seconds to reuse read-only responses; stats aggregate over hours, status can be toggled
+_CACHE_TTLS = {
+    "/control/stats": 30.0,
+    "/control/status": 5.0
+}
+
+
+def _top_entries(entries: Iterable[Dict[str, int]], n: int = TOP_N) -> List[Tuple[str, int]]:
+    """
+    Get the n largest (name, count) pairs from an AdGuard top-N list.
+    
+    AdGuard reports these as lists of single-entry dicts: [{"example.com": 42}, ...]
+    """
+    return heapq.nlargest(n, chain.from_iterable(e.items() for e in entries), key=itemgetter(1))
+
 
 class AdGuardTool(BaseTool):
     """Query AdGuard Home for DNS statistics and filtering status"""
@@ -25,9 +48,15 @@ Use this to check DNS filtering effectiveness and identify blocked domains/clien
         ToolParameter(
             name="action",
             type="string",
-            description="Action to perform: 'status' (general info), 'stats' (query statistics), 'top_blocked' (top blocked domains), 'top_clients' (most active clients), 'toggle_protection' (enable/disable protection)",
+            description="Action to perform: 'overview' (status, stats, top blocked domains and top clients in one call), 'status' (general info), 'stats' (query statistics), 'top_blocked' (top blocked domains), 'top_clients' (most active clients), 'toggle_protection' (enable/disable protection)",
             required=True,
-            enum=["status", "stats", "top_blocked", "top_clients", "toggle_protection"]
+            enum=["overview", "status", "stats", "top_blocked", "top_clients", "toggle_protection"]
+        ),
+        ToolParameter(
+            name="enabled",
+            type="boolean",
+            description="For 'toggle_protection': the protection state to set. Omit to flip the current state.",
+            required=False
         )
     ]
     
@@ -41,49 +70,82 @@ Use this to check DNS filtering effectiveness and identify blocked domains/clien
         encoded = b64encode(credentials.encode()).decode()
         self.auth_header = f"Basic {encoded}"
     
-    async def execute(self, action: str) -> Dict[str, Any]:
+    async def execute(self, action: str, enabled: Optional[bool] = None) -> Dict[str, Any]:
         """Execute AdGuard Home query based on action"""
-        async with httpx.AsyncClient(timeout=10.0, verify=False) as client:
-            headers = {"Authorization": self.auth_header}
-            
-            try:
-                if action == "status":
-                    return await self._get_status(client, headers)
-                elif action == "stats":
-                    return await self._get_stats(client, headers)
-                elif action == "top_blocked":
-                    return await self._get_top_blocked(client, headers)
-                elif action == "top_clients":
-                    return await self._get_top_clients(client, headers)
-                elif action == "toggle_protection":
-                    return await self._toggle_protection(client, headers)
-                else:
-                    return {
-                        "success": False,
-                        "error": f"Unknown action: {action}"
-                    }
-                    
-            except httpx.HTTPStatusError as e:
-                return {
-                    "success": False,
-                    "error": f"HTTP {e.response.status_code}: {e.response.text}"
-                }
-            except httpx.RequestError as e:
-                return {
-                    "success": False,
-                    "error": f"Connection error: {str(e)}"
-                }
-            except Exception as e:
+        client = get_http_client(verify=False)
+        headers = {"Authorization": self.auth_header}
+        
+        try:
+            if action == "overview":
+                return await self._get_overview(client, headers)
+            elif action == "status":
+                return await self._get_status(client, headers)
+            elif action == "stats":
+                return await self._get_stats(client, headers)
+            elif action == "top_blocked":
+                return await self._get_top_blocked(client, headers)
+            elif action == "top_clients":
+                return await self._get_top_clients(client, headers)
+            elif action == "toggle_protection":
+                return await self._toggle_protection(client, headers, enabled)
+            else:
                 return {
                     "success": False,
-                    "error": f"Unexpected error: {str(e)}"
+                    "error": f"Unknown action: {action}"
                 }
+                
+        except httpx.HTTPStatusError as e:
+            return {
+                "success": False,
+                "error": f"HTTP {e.response.status_code}: {e.response.text}"
+            }
+        except httpx.RequestError as e:
+            return {
+                "success": False,
+                "error": f"Connection error: {str(e)}"
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"Unexpected error: {str(e)}"
+            }
     
-    async def _get_status(self, client: httpx.AsyncClient, headers: Dict[str, str]) -> Dict[str, Any]:
-        """Get AdGuard Home general status"""
-        response = await client.get(f"{self.base_url}/control/status", headers=headers)
-        response.raise_for_status()
-        data = response.json()
+    async def _fetch(self, client: httpx.AsyncClient, path: str, headers: Dict[str, str]) -> Dict[str, Any]:
+        """GET an AdGuard Home API endpoint and return its JSON (cached per _CACHE_TTLS)"""
+        async def fetch() -> Dict[str, Any]:
+            response = await client.get(f"{self.base_url}{path}", headers=headers)
+            response.raise_for_status()
+            return json_body(response)
+        
+        ttl = _CACHE_TTLS.get(path)
+        if ttl is None:
+            return await fetch()
+        return await response_cache.get_or_fetch(f"adguard:{path}", ttl, fetch)
+    
+    async def _get_overview(self, client: httpx.AsyncClient, headers: Dict[str, str]) -> Dict[str, Any]:
+        """Get status, stats, top blocked domains and top clients from one status + one stats request"""
+        status, stats = await asyncio.gather(
+            self._fetch(client, "/control/status", headers),
+            self._fetch(client, "/control/stats", headers)
+        )
+        
+        return {
+            "success": True,
+            "status": await self._get_status(client, headers, status),
+            "stats": await self._get_stats(client, headers, stats),
+            "top_blocked": await self._get_top_blocked(client, headers, stats),
+            "top_clients": await self._get_top_clients(client, headers, stats)
+        }
+    
+    async def _get_status(
+        self,
+        client: httpx.AsyncClient,
+        headers: Dict[str, str],
+        data: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Get AdGuard Home general status (data: an already-fetched /control/status response)"""
+        if data is None:
+            data = await self._fetch(client, "/control/status", headers)
         
         return {
             "success": True,
@@ -95,11 +157,15 @@ Use this to check DNS filtering effectiveness and identify blocked domains/clien
             "filters_updated": data.get("filters_update_timestamp", "unknown")
         }
     
-    async def _get_stats(self, client: httpx.AsyncClient, headers: Dict[str, str]) -> Dict[str, Any]:
-        """Get DNS query statistics"""
-        response = await client.get(f"{self.base_url}/control/stats", headers=headers)
-        response.raise_for_status()
-        data = response.json()
+    async def _get_stats(
+        self,
+        client: httpx.AsyncClient,
+        headers: Dict[str, str],
+        data: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Get DNS query statistics (data: an already-fetched /control/stats response)"""
+        if data is None:
+            data = await self._fetch(client, "/control/stats", headers)
         
         total = data.get("num_dns_queries", 0)
         blocked = data.get("num_blocked_filtering", 0)
@@ -116,62 +182,62 @@ Use this to check DNS filtering effectiveness and identify blocked domains/clien
             "block_rate_percent": round(block_rate, 2)
         }
     
-    async def _get_top_blocked(self, client: httpx.AsyncClient, headers: Dict[str, str]) -> Dict[str, Any]:
-        """Get top blocked domains"""
-        response = await client.get(f"{self.base_url}/control/stats", headers=headers)
-        response.raise_for_status()
-        data = response.json()
-        
-        blocked_filters = data.get("blocked_filtering", [])
+    async def _get_top_blocked(
+        self,
+        client: httpx.AsyncClient,
+        headers: Dict[str, str],
+        data: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Get top blocked domains (data: an already-fetched /control/stats response)"""
+        if data is None:
+            data = await self._fetch(client, "/control/stats", headers)
         
-        # Convert to list of dicts for better readability
-        top_blocked = [
-            {"domain": domain, "count": count}
-            for domain, count in blocked_filters.items()
-        ]
-        
-        # Sort by count descending
-        top_blocked.sort(key=lambda x: x["count"], reverse=True)
+        blocked_domains = data.get("top_blocked_domains", [])
         
         return {
             "success": True,
-            "top_blocked_domains": top_blocked[:10],  # Top 10
-            "total_blocked_domains": len(blocked_filters)
+            "top_blocked_domains": [
+                {"domain": domain, "count": count}
+                for domain, count in _top_entries(blocked_domains)
+            ],
+            "total_blocked_domains": len(blocked_domains)
         }
     
-    async def _get_top_clients(self, client: httpx.AsyncClient, headers: Dict[str, str]) -> Dict[str, Any]:
-        """Get top DNS clients by query count"""
-        response = await client.get(f"{self.base_url}/control/stats", headers=headers)
-        response.raise_for_status()
-        data = response.json()
+    async def _get_top_clients(
+        self,
+        client: httpx.AsyncClient,
+        headers: Dict[str, str],
+        data: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Get top DNS clients by query count (data: an already-fetched /control/stats response)"""
+        if data is None:
+            data = await self._fetch(client, "/control/stats", headers)
         
-        top_queried_domains = data.get("top_queried_domains", [])
         top_clients_data = data.get("top_clients", [])
         
-        # Convert to list of dicts
-        top_clients = [
-            {"client": client, "queries": count}
-            for client, count in top_clients_data.items()
-        ]
-        
-        # Sort by queries descending
-        top_clients.sort(key=lambda x: x["queries"], reverse=True)
-        
         return {
             "success": True,
-            "top_clients": top_clients[:10],  # Top 10
+            "top_clients": [
+                {"client": name, "queries": count}
+                for name, count in _top_entries(top_clients_data)
+            ],
             "total_clients": len(top_clients_data)
         }
     
-    async def _toggle_protection(self, client: httpx.AsyncClient, headers: Dict[str, str]) -> Dict[str, Any]:
-        """Toggle AdGuard Home protection on/off"""
-        # First get current status
-        status_response = await client.get(f"{self.base_url}/control/status", headers=headers)
-        status_response.raise_for_status()
-        status_data = status_response.json()
-        
-        current_protection = status_data.get("protection_enabled", False)
-        new_protection = not current_protection
+    async def _toggle_protection(
+        self,
+        client: httpx.AsyncClient,
+        headers: Dict[str, str],
+        enabled: Optional[bool] = None
+    ) -> Dict[str, Any]:
+        """Set AdGuard Home protection on/off (enabled=None flips the current state)"""
+        if enabled is not None:
+            # Target state given: setting it is idempotent, no status read needed
+            new_protection = enabled
+        else:
+            # Flip the current state (a status read within the last few seconds is reused)
+            status_data = await self._fetch(client, "/control/status", headers)
+            new_protection = not status_data.get("protection_enabled", False)
         
         # Toggle protection
         payload = {"enabled": new_protection}
@@ -181,6 +247,7 @@ Use this to check DNS filtering effectiveness and identify blocked domains/clien
             json=payload
         )
         response.raise_for_status()
+        response_cache.invalidate("adguard:/control/status")
         
         return {
             "success": True,
@@ -3,13 +3,19 @@ Docker Logs Tool for JARVIS v3
 Query Docker container logs via Portainer API for troubleshooting and monitoring
 """
 import httpx
-from typing import Dict, Any, Optional
+from collections import deque
+from typing import AsyncIterator, Dict, Any, Optional
 
 from app.tools.base import BaseTool, ToolParameter, ToolDomain
+from app.tools.http_client import get_http_client
 from app.config.settings import get_settings
 
 settings = get_settings()
 
+# Non-TTY containers' logs are multiplexed into frames, each with an 8-byte header:
+# 1 byte stream type (0-2), 3 zero bytes, 4-byte big-endian payload size
+FRAME_HEADER_SIZE = 8
+
 
 class DockerLogsTool(BaseTool):
     """Query Docker container logs for troubleshooting and monitoring"""
@@ -18,6 +24,7 @@ class DockerLogsTool(BaseTool):
     description = """Query Docker container logs for troubleshooting and monitoring. Use this to view recent log entries from any Docker container. You can retrieve a specific number of lines, search for specific text patterns, or view the most recent logs."""
     
     domain = ToolDomain.HOMELAB
+    cacheable = True  # Read-only
     
     parameters = [
         ToolParameter(
@@ -58,23 +65,50 @@ class DockerLogsTool(BaseTool):
             raise ValueError("PORTAINER_API_KEY not configured")
     
     @staticmethod
-    def _clean_docker_log_line(line: str) -> str:
-        """
-        Clean Docker log stream format.
-        Docker logs are prefixed with 8 bytes: [stream_type][000][size(4 bytes)]
+    async def _iter_log_lines(response: httpx.Response) -> AsyncIterator[str]:
         """
-        if not line:
-            return ""
+        Yield log lines from a Docker logs response body.
         
-        # Strip leading/trailing whitespace
-        line = line.strip()
+        Frame headers are stripped from the raw bytes (not the decoded text, where
+        they may be mangled), and only complete lines are decoded. TTY containers'
+        logs have no frames and pass through as-is.
+        """
+        raw = bytearray()  # Received bytes not yet demultiplexed
+        data = bytearray()  # Log bytes not yet split into lines
+        multiplexed = None
         
-        # If line starts with stream header bytes, skip first 8 bytes
-        # The header is: 1 byte stream type + 3 bytes padding + 4 bytes size
-        if len(line) > 8 and ord(line[0]) in (0, 1, 2):  # Stream type byte
-            line = line[8:]
+        async for chunk in response.aiter_bytes():
+            raw += chunk
+            if multiplexed is None:
+                if len(raw) < FRAME_HEADER_SIZE:
+                    continue
+                multiplexed = raw[0] in (0, 1, 2) and raw[1:4] == b"\x00\x00\x00"
+            
+            if multiplexed:
+                # Copy out every complete frame's payload, keeping a partial frame for later
+                pos = 0
+                while len(raw) - pos >= FRAME_HEADER_SIZE:
+                    end = pos + FRAME_HEADER_SIZE + int.from_bytes(raw[pos + 4:pos + 8], "big")
+                    if end > len(raw):
+                        break
+                    data += raw[pos + FRAME_HEADER_SIZE:end]
+                    pos = end
+                del raw[:pos]
+            else:
+                data += raw
+                raw.clear()
+            
+            cut = data.rfind(b"\n")
+            if cut >= 0:
+                for line in data[:cut].decode("utf-8", errors="replace").split("\n"):
+                    yield line
+                del data[:cut + 1]
         
-        return line
+        # Whatever is left: a body shorter than one header, or a truncated last frame
+        data += raw[FRAME_HEADER_SIZE:] if multiplexed else raw
+        if data:
+            for line in data.decode("utf-8", errors="replace").split("\n"):
+                yield line
     
     async def execute(
         self, 
@@ -102,67 +136,68 @@ class DockerLogsTool(BaseTool):
             "timestamps": "true" if show_timestamps else "false"
         }
         
-        async with httpx.AsyncClient(timeout=30.0, verify=False) as client:
-            try:
-                # Get logs via Portainer's Docker API proxy
-                response = await client.get(
-                    f"{self.base_url}/api/endpoints/{eid}/docker/containers/{container}/logs",
-                    headers=headers,
-                    params=params
-                )
+        client = get_http_client(verify=False)
+        try:
+            # Lines are cleaned and filtered as they stream in; only the last `tail`
+            # matches are kept even if the server sends more
+            search_lower = search_term.lower() if search_term else None
+            log_lines = deque(maxlen=tail if tail > 0 else None)
+            
+            # Get logs via Portainer's Docker API proxy
+            async with client.stream(
+                "GET",
+                f"{self.base_url}/api/endpoints/{eid}/docker/containers/{container}/logs",
+                headers=headers,
+                params=params,
+                timeout=30.0
+            ) as response:
+                if response.is_error:
+                    # Load the body so the error handler can include it
+                    await response.aread()
                 response.raise_for_status()
                 
-                # Docker logs come back with stream headers (8 bytes per line)
-                logs_text = response.text
-                
-                # Split into lines and clean up Docker stream format
-                log_lines = []
-                for line in logs_text.split('\n'):
-                    cleaned = self._clean_docker_log_line(line)
-                    if cleaned:
-                        log_lines.append(cleaned)
-                
-                # Apply search filter if provided
-                if search_term:
-                    log_lines = [line for line in log_lines if search_term.lower() in line.lower()]
-                
-                # Count total lines
-                total_lines = len(log_lines)
-                
-                # Join lines back together for display
-                logs_output = '\n'.join(log_lines)
-                
-                return {
-                    "success": True,
-                    "container": container,
-                    "endpoint_id": eid,
-                    "lines_retrieved": total_lines,
-                    "lines_requested": tail,
-                    "search_term": search_term,
-                    "timestamps": show_timestamps,
-                    "logs": logs_output,
-                    "message": f"Retrieved {total_lines} log lines from container '{container}'"
-                }
-                    
-            except httpx.HTTPStatusError as e:
-                error_msg = f"HTTP {e.response.status_code}"
-                if e.response.status_code == 404:
-                    error_msg = f"Container '{container}' not found on endpoint {eid}"
-                elif e.response.status_code == 500:
-                    error_msg = f"Container '{container}' may not be running or accessible"
-                else:
-                    error_msg = f"{error_msg}: {e.response.text[:200]}"
+                async for line in self._iter_log_lines(response):
+                    line = line.strip()
+                    if line and (search_lower is None or search_lower in line.lower()):
+                        log_lines.append(line)
+            
+            # Count total lines
+            total_lines = len(log_lines)
+            
+            # Join lines back together for display
+            logs_output = '\n'.join(log_lines)
+            
+            return {
+                "success": True,
+                "container": container,
+                "endpoint_id": eid,
+                "lines_retrieved": total_lines,
+                "lines_requested": tail,
+                "search_term": search_term,
+                "timestamps": show_timestamps,
+                "logs": logs_output,
+                "message": f"Retrieved {total_lines} log lines from container '{container}'"
+            }
                 
-                return {
-                    "success": False,
-                    "error": error_msg,
-                    "container": container,
-                    "endpoint_id": eid
-                }
-            except Exception as e:
-                return {
-                    "success": False,
-                    "error": str(e),
-                    "container": container,
-                    "endpoint_id": eid
-                }
+        except httpx.HTTPStatusError as e:
+            error_msg = f"HTTP {e.response.status_code}"
+            if e.response.status_code == 404:
+                error_msg = f"Container '{container}' not found on endpoint {eid}"
+            elif e.response.status_code == 500:
+                error_msg = f"Container '{container}' may not be running or accessible"
+            else:
+                error_msg = f"{error_msg}: {e.response.text[:200]}"
+            
+            return {
+                "success": False,
+                "error": error_msg,
+                "container": container,
+                "endpoint_id": eid
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "container": container,
+                "endpoint_id": eid
+            }
@@ -6,10 +6,15 @@ import httpx
 from typing import Dict, Any, Optional
 
 from app.tools.base import BaseTool, ToolParameter, ToolDomain
+from app.tools.cache import response_cache
+from app.tools.http_client import get_http_client, json_body
 from app.config.settings import get_settings
 
 settings = get_settings()
 
+# Dashboards and datasources change rarely; reuse their listings for this many seconds
+LISTING_CACHE_TTL = 60.0
+
 
 class GrafanaTool(BaseTool):
     """Query Grafana for dashboards, alerts, datasources, and health status"""
@@ -23,6 +28,7 @@ class GrafanaTool(BaseTool):
 - Visualization and monitoring overview"""
     
     domain = ToolDomain.HOMELAB
+    cacheable = True  # Read-only
     
     parameters = [
         ToolParameter(
@@ -44,45 +50,53 @@ class GrafanaTool(BaseTool):
         """Execute Grafana API query based on action"""
         action = action.lower().strip()
         
-        async with httpx.AsyncClient(timeout=10.0, verify=False) as client:
-            try:
-                if action == "dashboards":
-                    return await self._get_dashboards(client)
-                elif action == "alerts":
-                    return await self._get_alerts(client)
-                elif action == "datasources":
-                    return await self._get_datasources(client)
-                elif action == "health":
-                    return await self._get_health(client)
-                else:
-                    return {
-                        "success": False,
-                        "error": f"Unknown action: {action}",
-                        "valid_actions": ["dashboards", "alerts", "datasources", "health"]
-                    }
-                    
-            except httpx.HTTPStatusError as e:
+        client = get_http_client(verify=False)
+        try:
+            if action == "dashboards":
+                return await self._get_dashboards(client)
+            elif action == "alerts":
+                return await self._get_alerts(client)
+            elif action == "datasources":
+                return await self._get_datasources(client)
+            elif action == "health":
+                return await self._get_health(client)
+            else:
                 return {
                     "success": False,
-                    "error": f"HTTP {e.response.status_code}: {e.response.text[:200]}",
-                    "action": action
-                }
-            except Exception as e:
-                return {
-                    "success": False,
-                    "error": str(e),
-                    "action": action
+                    "error": f"Unknown action: {action}",
+                    "valid_actions": ["dashboards", "alerts", "datasources", "health"]
                 }
+                
+        except httpx.HTTPStatusError as e:
+            return {
+                "success": False,
+                "error": f"HTTP {e.response.status_code}: {e.response.text[:200]}",
+                "action": action
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "action": action
+            }
+    
+    async def _fetch_listing(
+        self,
+        client: httpx.AsyncClient,
+        path: str,
+        params: Optional[Dict[str, str]] = None
+    ) -> Any:
+        """GET a Grafana listing endpoint, reusing responses younger than LISTING_CACHE_TTL"""
+        async def fetch() -> Any:
+            response = await client.get(f"{self.base_url}{path}", headers=self.headers, params=params)
+            response.raise_for_status()
+            return json_body(response)
+        
+        return await response_cache.get_or_fetch(f"grafana:{path}", LISTING_CACHE_TTL, fetch)
     
     async def _get_dashboards(self, client: httpx.AsyncClient) -> Dict[str, Any]:
         """Get list of all dashboards"""
-        response = await client.get(
-            f"{self.base_url}/api/search",
-            headers=self.headers,
-            params={"type": "dash-db"}
-        )
-        response.raise_for_status()
-        dashboards = response.json()
+        dashboards = await self._fetch_listing(client, "/api/search", {"type": "dash-db"})
         
         # Format dashboard info
         formatted = []
@@ -110,7 +124,7 @@ class GrafanaTool(BaseTool):
             headers=self.headers
         )
         response.raise_for_status()
-        alerts = response.json()
+        alerts = json_body(response)
         
         # Categorize alerts by state
         alert_summary = {
@@ -122,17 +136,19 @@ class GrafanaTool(BaseTool):
         }
         
         for alert in alerts:
-            state = alert.get("state", "unknown").lower()
-            alert_info = {
+            raw_state = alert.get("state", "unknown")
+            bucket = alert_summary.get(raw_state.lower())
+            if bucket is None:
+                # Unlisted state: skip without building its summary entry
+                continue
+            
+            bucket.append({
                 "name": alert.get("name"),
-                "state": alert.get("state"),
+                "state": raw_state,
                 "dashboard_title": alert.get("dashboardTitle"),
                 "panel_name": alert.get("panelName"),
                 "eval_date": alert.get("evalDate")
-            }
-            
-            if state in alert_summary:
-                alert_summary[state].append(alert_info)
+            })
         
         return {
             "success": True,
@@ -148,12 +164,7 @@ class GrafanaTool(BaseTool):
     
     async def _get_datasources(self, client: httpx.AsyncClient) -> Dict[str, Any]:
         """Get list of configured data sources"""
-        response = await client.get(
-            f"{self.base_url}/api/datasources",
-            headers=self.headers
-        )
-        response.raise_for_status()
-        datasources = response.json()
+        datasources = await self._fetch_listing(client, "/api/datasources")
         
         # Format datasource info
         formatted = []
@@ -181,7 +192,7 @@ class GrafanaTool(BaseTool):
             headers=self.headers
         )
         response.raise_for_status()
-        health = response.json()
+        health = json_body(response)
         
         return {
             "success": True,
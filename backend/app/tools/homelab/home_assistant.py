@@ -6,10 +6,16 @@ import httpx
 from typing import Dict, Any, Optional, List
 
 from app.tools.base import BaseTool, ToolParameter, ToolDomain
+from app.tools.cache import response_cache
+from app.tools.http_client import get_http_client, json_body
 from app.config.settings import get_settings
 
 settings = get_settings()
 
+# All entity states (/api/states) are reused briefly so back-to-back queries share one fetch
+STATES_CACHE_KEY = "home_assistant:/api/states"
+STATES_CACHE_TTL = 2.0
+
 
 class QueryHomeAssistantTool(BaseTool):
     """Query Home Assistant for entity states and information"""
@@ -18,12 +24,13 @@ class QueryHomeAssistantTool(BaseTool):
     description = """Query Home Assistant for device and sensor information. Use this to check the state of lights, switches, sensors, climate controls, and other entities. Can list entities by domain (light, switch, sensor, etc.) or query specific entities."""
     
     domain = ToolDomain.HOMELAB
+    cacheable = True  # Read-only
     
     parameters = [
         ToolParameter(
             name="info_type",
             type="string",
-            description="Type of query: domains (list available domains), list (list entities in a domain), entity (get specific entity state)",
+            description="Type of query: domains (list available domains), list (list entities in a domain), entity (get specific entity state, or several at once with entity_ids)",
             enum=["domains", "list", "entity"]
         ),
         ToolParameter(
@@ -35,7 +42,13 @@ class QueryHomeAssistantTool(BaseTool):
         ToolParameter(
             name="entity_id",
             type="string",
-            description="Entity ID to query (e.g., light.living_room, sensor.temperature). Required when info_type is entity.",
+            description="Entity ID to query (e.g., light.living_room, sensor.temperature). Required when info_type is entity, unless entity_ids is given.",
+            required=False
+        ),
+        ToolParameter(
+            name="entity_ids",
+            type="array",
+            description="Several entity IDs to query in one call (info_type entity). Prefer this over repeated single-entity queries.",
             required=False
         )
     ]
@@ -46,109 +59,153 @@ class QueryHomeAssistantTool(BaseTool):
         if not self.token:
             raise ValueError("HOME_ASSISTANT_TOKEN not configured")
     
-    async def execute(self, info_type: str, domain_filter: Optional[str] = None, entity_id: Optional[str] = None) -> Dict[str, Any]:
+    async def _get_all_states(self, client: httpx.AsyncClient, headers: Dict[str, str]) -> List[Dict[str, Any]]:
+        """Get every entity state, reusing a fetch from the last STATES_CACHE_TTL seconds"""
+        async def fetch() -> List[Dict[str, Any]]:
+            response = await client.get(
+                f"{self.base_url}/api/states",
+                headers=headers
+            )
+            response.raise_for_status()
+            return json_body(response)
+        
+        return await response_cache.get_or_fetch(STATES_CACHE_KEY, STATES_CACHE_TTL, fetch)
+    
+    @staticmethod
+    def _entity_info(state: Dict[str, Any]) -> Dict[str, Any]:
+        """Summarize an entity state for an entity query"""
+        return {
+            "entity_id": state["entity_id"],
+            "state": state["state"],
+            "attributes": state.get("attributes", {}),
+            "last_changed": state.get("last_changed"),
+            "last_updated": state.get("last_updated")
+        }
+    
+    async def execute(
+        self,
+        info_type: str,
+        domain_filter: Optional[str] = None,
+        entity_id: Optional[str | List[str]] = None,
+        entity_ids: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
         """Execute Home Assistant query"""
         headers = {
             "Authorization": f"Bearer {self.token}",
             "Content-Type": "application/json"
         }
         
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            try:
-                if info_type == "domains":
-                    # Get all states and extract unique domains
-                    response = await client.get(
-                        f"{self.base_url}/api/states",
-                        headers=headers
-                    )
-                    response.raise_for_status()
-                    states = response.json()
-                    
-                    # Count entities per domain
-                    domain_counts = {}
-                    for state in states:
-                        entity_domain = state["entity_id"].split(".")[0]
-                        domain_counts[entity_domain] = domain_counts.get(entity_domain, 0) + 1
-                    
+        client = get_http_client()
+        try:
+            if info_type == "domains":
+                # Get all states and extract unique domains
+                states = await self._get_all_states(client, headers)
+                
+                # Count entities per domain
+                domain_counts = {}
+                for state in states:
+                    entity_domain = state["entity_id"].split(".")[0]
+                    domain_counts[entity_domain] = domain_counts.get(entity_domain, 0) + 1
+                
+                return {
+                    "success": True,
+                    "info_type": "domains",
+                    "total_entities": len(states),
+                    "domains": dict(sorted(domain_counts.items(), key=lambda x: -x[1]))
+                }
+            
+            elif info_type == "list":
+                if not domain_filter:
                     return {
-                        "success": True,
-                        "info_type": "domains",
-                        "total_entities": len(states),
-                        "domains": dict(sorted(domain_counts.items(), key=lambda x: -x[1]))
+                        "success": False,
+                        "error": "domain_filter is required when info_type is list. Use info_type=domains to see available domains."
                     }
                 
-                elif info_type == "list":
-                    if not domain_filter:
-                        return {
-                            "success": False,
-                            "error": "domain_filter is required when info_type is list. Use info_type=domains to see available domains."
-                        }
-                    
-                    response = await client.get(
-                        f"{self.base_url}/api/states",
-                        headers=headers
-                    )
-                    response.raise_for_status()
-                    states = response.json()
-                    
-                    # Filter by domain and return simplified info
-                    filtered = []
-                    for state in states:
-                        if state["entity_id"].startswith(f"{domain_filter}."):
-                            filtered.append({
-                                "entity_id": state["entity_id"],
-                                "state": state["state"],
-                                "name": state.get("attributes", {}).get("friendly_name", state["entity_id"])
-                            })
+                states = await self._get_all_states(client, headers)
+                
+                # Filter by domain and return simplified info
+                filtered = []
+                for state in states:
+                    if state["entity_id"].startswith(f"{domain_filter}."):
+                        filtered.append({
+                            "entity_id": state["entity_id"],
+                            "state": state["state"],
+                            "name": state.get("attributes", {}).get("friendly_name", state["entity_id"])
+                        })
+                
+                return {
+                    "success": True,
+                    "info_type": "list",
+                    "domain": domain_filter,
+                    "count": len(filtered),
+                    "entities": filtered[:100]  # Limit to 100 entities
+                }
+            
+            elif info_type == "entity":
+                # Claude may also pass a list as entity_id
+                if isinstance(entity_id, list):
+                    entity_ids = [*(entity_ids or []), *entity_id]
+                    entity_id = None
+                
+                if entity_ids:
+                    # Several entities: one /api/states fetch, filtered locally
+                    wanted = list(entity_ids)
+                    if entity_id:
+                        wanted.append(entity_id)
+                    wanted = list(dict.fromkeys(wanted))  # De-duplicate, keeping order
+                    states = await self._get_all_states(client, headers)
+                    by_id = {state["entity_id"]: state for state in states}
                     
                     return {
                         "success": True,
-                        "info_type": "list",
-                        "domain": domain_filter,
-                        "count": len(filtered),
-                        "entities": filtered[:100]  # Limit to 100 entities
+                        "info_type": "entity",
+                        "count": sum(1 for eid in wanted if eid in by_id),
+                        "entities": [self._entity_info(by_id[eid]) for eid in wanted if eid in by_id],
+                        "not_found": [eid for eid in wanted if eid not in by_id]
                     }
                 
-                elif info_type == "entity":
-                    if not entity_id:
-                        return {
-                            "success": False,
-                            "error": "entity_id is required when info_type is entity"
-                        }
-                    
+                if not entity_id:
+                    return {
+                        "success": False,
+                        "error": "entity_id is required when info_type is entity"
+                    }
+                
+                # Answer from a just-fetched full state list when there is one
+                state = None
+                cached_states = response_cache.peek(STATES_CACHE_KEY)
+                if cached_states is not None:
+                    state = next((s for s in cached_states if s["entity_id"] == entity_id), None)
+                
+                if state is None:
                     response = await client.get(
                         f"{self.base_url}/api/states/{entity_id}",
                         headers=headers
                     )
                     response.raise_for_status()
-                    state = response.json()
-                    
-                    return {
-                        "success": True,
-                        "info_type": "entity",
-                        "entity_id": entity_id,
-                        "state": state["state"],
-                        "attributes": state.get("attributes", {}),
-                        "last_changed": state.get("last_changed"),
-                        "last_updated": state.get("last_updated")
-                    }
+                    state = json_body(response)
                 
-                else:
-                    return {
-                        "success": False,
-                        "error": f"Invalid info_type: {info_type}. Use domains, list, or entity."
-                    }
-                    
-            except httpx.HTTPStatusError as e:
                 return {
-                    "success": False,
-                    "error": f"HTTP {e.response.status_code}: {e.response.text[:200]}"
+                    "success": True,
+                    "info_type": "entity",
+                    **self._entity_info(state)
                 }
-            except Exception as e:
+            
+            else:
                 return {
                     "success": False,
-                    "error": f"Error: {str(e)}"
+                    "error": f"Invalid info_type: {info_type}. Use domains, list, or entity."
                 }
+                
+        except httpx.HTTPStatusError as e:
+            return {
+                "success": False,
+                "error": f"HTTP {e.response.status_code}: {e.response.text[:200]}"
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"Error: {str(e)}"
+            }
 
 
 class ManageHomeAssistantTool(BaseTool):
@@ -222,29 +279,31 @@ class ManageHomeAssistantTool(BaseTool):
             except ValueError:
                 data["value"] = value
         
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            try:
-                response = await client.post(
-                    f"{self.base_url}/api/services/{domain}/{service}",
-                    headers=headers,
-                    json=data
-                )
-                response.raise_for_status()
-                
-                return {
-                    "success": True,
-                    "action": action,
-                    "entity_id": entity_id,
-                    "message": f"Successfully executed {action} on {entity_id}"
-                }
-                
-            except httpx.HTTPStatusError as e:
-                return {
-                    "success": False,
-                    "error": f"HTTP {e.response.status_code}: {e.response.text[:200]}"
-                }
-            except Exception as e:
-                return {
-                    "success": False,
-                    "error": f"Error: {str(e)}"
-                }
+        client = get_http_client()
+        try:
+            response = await client.post(
+                f"{self.base_url}/api/services/{domain}/{service}",
+                headers=headers,
+                json=data
+            )
+            response.raise_for_status()
+            # The change makes any cached entity states stale
+            response_cache.invalidate(STATES_CACHE_KEY)
+            
+            return {
+                "success": True,
+                "action": action,
+                "entity_id": entity_id,
+                "message": f"Successfully executed {action} on {entity_id}"
+            }
+            
+        except httpx.HTTPStatusError as e:
+            return {
+                "success": False,
+                "error": f"HTTP {e.response.status_code}: {e.response.text[:200]}"
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"Error: {str(e)}"
+            }
@@ -18,6 +18,7 @@ class NginxProxyManagerTool(BaseTool):
     description = """Query Nginx Proxy Manager for proxy hosts, SSL certificates, redirections, and status. Use this to check which domains are proxied, view SSL certificate status, or list redirections."""
     
     domain = ToolDomain.HOMELAB
+    cacheable = True  # Read-only
     
     parameters = [
         ToolParameter(
@@ -18,6 +18,7 @@ class QueryPortainerTool(BaseTool):
     description = """Query Portainer for Docker container and endpoint information. Use this to check container status, get list of containers, or view available endpoints."""
     
     domain = ToolDomain.HOMELAB
+    cacheable = True  # Read-only
     
     parameters = [
         ToolParameter(
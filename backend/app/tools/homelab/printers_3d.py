@@ -22,6 +22,7 @@ class Printers3DTool(BaseTool):
     description = """Query 3D printers (Bambu Lab X1C, Prusa MK3.5) for print status, temperatures, current job progress. Use this to monitor active prints or check printer availability."""
     
     domain = ToolDomain.HOMELAB
+    cacheable = True  # Read-only
     
     parameters = [
         ToolParameter(
@@ -23,6 +23,7 @@ class PrometheusTool(BaseTool):
 - Custom PromQL queries"""
     
     domain = ToolDomain.HOMELAB
+    cacheable = True  # Read-only
     
     parameters = [
         ToolParameter(
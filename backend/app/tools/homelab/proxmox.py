@@ -50,6 +50,7 @@ class ProxmoxQueryTool(BaseTool):
 - all: Get all resources across the cluster (nodes, VMs, containers)"""
     
     domain = ToolDomain.HOMELAB
+    cacheable = True  # Read-only
     
     parameters = [
         ToolParameter(
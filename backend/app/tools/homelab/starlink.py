@@ -22,6 +22,7 @@ class StarlinkTool(BaseTool):
 - Device info and software version"""
     
     domain = ToolDomain.HOMELAB
+    cacheable = True  # Read-only
     
     parameters = [
         ToolParameter(
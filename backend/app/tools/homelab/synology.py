@@ -18,6 +18,7 @@ class SynologyTool(BaseTool):
     description = """Query Synology NAS for storage information, system status, shared folders, and health metrics. Use this to check disk usage, system info, available shares, or overall system health."""
     
     domain = ToolDomain.HOMELAB
+    cacheable = True  # Read-only
     
     parameters = [
         ToolParameter(
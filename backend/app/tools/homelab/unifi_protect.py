@@ -261,6 +261,7 @@ class UniFiProtectQueryTool(BaseTool):
 - 'doorbell': Get doorbell camera specific info (rings, motion, connection)"""
     
     domain = ToolDomain.HOMELAB
+    cacheable = True  # Read-only
     
     parameters = [
         ToolParameter(
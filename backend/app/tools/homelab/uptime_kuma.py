@@ -19,6 +19,7 @@ class UptimeKumaTool(BaseTool):
 Use this to check the health and availability of all monitored services in the homelab."""
     
     domain = ToolDomain.HOMELAB
+    cacheable = True  # Read-only
     
     parameters = []  # No parameters required - returns all services
     
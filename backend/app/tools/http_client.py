@@ -0,0 +1,52 @@
+"""
+Shared HTTP clients for JARVIS v3 tools
+Long-lived httpx clients so repeated tool calls reuse pooled connections
+"""
+from typing import Any, Dict
+
+import httpx
+import orjson
+
+# Tools hit the same few homelab hosts over and over; keeping connections alive
+# skips the TCP/TLS handshake on every call. Keep-alive expiry bounds how long
+# a pooled connection (and its resolved address) is reused.
+_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60.0)
+_DEFAULT_TIMEOUT = 10.0
+
+# One client per TLS verification mode (most homelab services use self-signed certs)
+_clients: Dict[bool, httpx.AsyncClient] = {}
+
+
+def get_http_client(verify: bool = True) -> httpx.AsyncClient:
+    """
+    Get the shared HTTP client, creating it on first use.
+
+    Args:
+        verify: Whether to verify TLS certificates
+
+    Returns:
+        Pooled AsyncClient (10s default timeout; pass timeout= per request to override)
+    """
+    client = _clients.get(verify)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            http2=True,
+            limits=_LIMITS,
+            timeout=_DEFAULT_TIMEOUT,
+            verify=verify
+        )
+        _clients[verify] = client
+    return client
+
+
+def json_body(response: httpx.Response) -> Any:
+    """Parse a JSON response body with orjson (much faster than response.json() on large payloads)"""
+    return orjson.loads(response.content)
+
+
+async def close_http_clients() -> None:
+    """Close all shared HTTP clients (call on shutdown)"""
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        await client.aclose()
@@ -102,6 +102,10 @@ class ToolRegistry:
         """Get a tool by name"""
         return self._tools.get(name)
     
+    def snapshot(self) -> Dict[str, BaseTool]:
+        """Get a name -> tool mapping of the currently registered tools"""
+        return dict(self._tools)
+    
     def get_tools_for_domain(self, domain: ToolDomain | str) -> List[BaseTool]:
         """Get all tools for a domain"""
         if isinstance(domain, str):
@@ -113,11 +117,11 @@ class ToolRegistry:
     def get_schemas_for_domain(self, domain: ToolDomain | str) -> List[Dict]:
         """Get Claude tool schemas for a domain"""
         tools = self.get_tools_for_domain(domain)
-        return [tool.to_claude_schema() for tool in tools]
+        return [tool.claude_schema for tool in tools]
     
     def get_all_schemas(self) -> List[Dict]:
         """Get all tool schemas"""
-        return [tool.to_claude_schema() for tool in self._tools.values()]
+        return [tool.claude_schema for tool in self._tools.values()]
     
     def list_tools(self) -> List[str]:
         """List all registered tool names"""
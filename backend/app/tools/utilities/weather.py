@@ -53,6 +53,7 @@ class WeatherTool(BaseTool):
     description = """Get current weather and forecast. Returns temperature, conditions, humidity, wind, and multi-day forecast. Uses default home location if coordinates not specified."""
     
     domain = ToolDomain.UTILITIES
+    cacheable = True  # Read-only
     
     parameters = [
         ToolParameter(